@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for scrape_articles.py
+
+Serves a synthetic site (or pages and images recorded with
+`scrape_articles.py --archive`) from a local HTTP server running in its own
+process, points the scraper at it and times get_article_links(),
+scrape_article() and process_images(). Latency, error rate and bandwidth of
+the stand-in server are configurable and seeded, so results from different
+commits are comparable:
+
+    python scripts/bench_scraper.py --output bench-before.json
+    git checkout my-branch
+    python scripts/bench_scraper.py --baseline bench-before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+SCRIPTS_DIR = Path(__file__).parent
+
+DEFAULT_ARTICLES = 120
+DEFAULT_IMAGES = 4  # per article, plus a hero image
+DEFAULT_IMAGE_SIZE = '320x200'
+DEFAULT_LATENCY_MS = 20.0
+DEFAULT_JITTER_MS = 5.0
+DEFAULT_SEED = 1
+LISTING_PAGE_SIZE = 10
+IMAGE_VARIANTS = 16
+
+# The listing pages get_article_links() walks, see scrape_articles.py
+CATEGORIES = [
+    ('muscle-building', 'Muscle Building'), ('fat-loss', 'Fat Loss'), ('training', 'Training'),
+    ('nutrition', 'Nutrition'), ('supplements', 'Supplements'), ('women', 'For Women'),
+    ('motivation', 'Motivation'), ('recovery', 'Recovery'),
+    ('sports-performance', 'Sports Performance'), ('injury-prevention', 'Injury Prevention'),
+    ('fitness-lifestyle', 'Fitness Lifestyle'), ('athlete-profiles', 'Athlete Profiles'),
+]
+
+WORDS = ('muscle strength protein training volume recovery sleep calories squat bench '
+         'deadlift press rows sets reps tempo hypertrophy progressive overload nutrition '
+         'carbs fats hydration mobility warm-up intensity frequency program results').split()
+
+def is_listing_path(path):
+    path = path.rstrip('/') or '/'
+    return path in ('/', '/articles') or path in {f'/articles/{slug}' for slug, _ in CATEGORIES}
+
+def make_png(width, height, rng):
+    """Build a noisy RGB PNG without any imaging library, noise keeps it from compressing"""
+    row = width * 3
+    raw = b''.join(b'\x00' + rng.randbytes(row) for _ in range(height))
+    
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data +
+                struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+    
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(raw, 1)) + chunk(b'IEND', b''))
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+class SyntheticSite:
+    """Deterministic article corpus: listing pages, article pages and PNG images"""
+    
+    def __init__(self, articles, images, image_size, seed):
+        rng = random.Random(seed)
+        width, height = (int(n) for n in image_size.split('x'))
+        self.images = [make_png(width, height, rng) for _ in range(IMAGE_VARIANTS)]
+        self.articles = {}
+        self.by_category = {slug: [] for slug, _ in CATEGORIES}
+        for n in range(articles):
+            slug = f'benchmark-article-{n:04d}'
+            category = CATEGORIES[n % len(CATEGORIES)]
+            self.articles[slug] = self.article_page(slug, category, images, rng)
+            self.by_category[category[0]].append(slug)
+        self.all_slugs = list(self.articles)
+        self.article_paths = [f'/articles/{slug}' for slug in self.all_slugs]
+    
+    @staticmethod
+    def article_page(slug, category, images, rng):
+        cat_slug, cat_name = category
+        body = []
+        for i in range(rng.randint(8, 20)):
+            if i % 4 == 0:
+                body.append(f'<h2>{sentence(rng, 4)}</h2>')
+            body.append(f'<p>{" ".join(sentence(rng) for _ in range(rng.randint(3, 8)))}</p>')
+            if i < images:
+                body.append(f'<figure><img src="/images/{slug}/image-{i}.png" '
+                            f'alt="{sentence(rng, 3)}"></figure>')
+        return f'''<!DOCTYPE html>
+<html><head><title>{sentence(rng, 6)} | Muscle & Strength</title>
+<meta property="og:description" content="{sentence(rng, 20)}">
+<meta property="og:image" content="/images/{slug}/hero.png">
+<script>window.dataLayer = [];</script></head>
+<body><header><nav><a href="/">Home</a> <a href="/articles/{cat_slug}">{cat_name}</a></nav></header>
+<h1>{sentence(rng, 6)}</h1>
+<article>{"".join(body)}
+<div class="advertisement">Sponsored</div><div class="social-share">Share</div>
+<script>track("{slug}");</script></article>
+<footer><p>Footer links</p></footer></body></html>'''.encode()
+
+    def listing(self, path, page):
+        if path in ('/', '/articles'):
+            slugs = self.all_slugs
+        else:
+            slugs = self.by_category[path.rsplit('/', 1)[-1]]
+        start = (page - 1) * LISTING_PAGE_SIZE
+        links = ''.join(f'<li><a href="/articles/{slug}">{slug}</a></li>'
+                        for slug in slugs[start:start + LISTING_PAGE_SIZE])
+        nav = ''.join(f'<a href="/articles/{cat}">{name}</a>' for cat, name in CATEGORIES)
+        return (f'<html><body><nav>{nav}</nav><ul>{links}</ul>'
+                f'<a href="{path}?page={page + 1}">Next</a></body></html>').encode()
+    
+    def get(self, path, query):
+        """Return (status, content_type, body) for a request path"""
+        if path.startswith('/images/'):
+            variant = zlib.crc32(path.encode()) % len(self.images)
+            return 200, 'image/png', self.images[variant]
+        slug = path.rsplit('/', 1)[-1]
+        if path.startswith('/articles/') and slug in self.articles:
+            return 200, 'text/html; charset=utf-8', self.articles[slug]
+        if not is_listing_path(path):
+            return 404, 'text/plain', b'not found'
+        return 200, 'text/html; charset=utf-8', self.listing(path.rstrip('/') or '/',
+                                                             int(query.get('page', 1)))
+
+class RecordedSite:
+    """Pages and images from a ResponseArchive, with the original host rewritten
+    to the benchmark server. Listing pages are not archived, so they link every
+    recorded article."""
+    
+    def __init__(self, archive_dir):
+        sys.path.insert(0, str(SCRIPTS_DIR))
+        from scrape_articles import ResponseArchive
+        
+        self.archive = ResponseArchive(archive_dir, readonly=True)
+        self.paths = {}
+        self.origins = set()
+        self.article_paths = []
+        for kind in ('page', 'image'):
+            for url in self.archive.urls(kind):
+                parsed = urlparse(url)
+                self.paths[parsed.path] = url
+                self.origins.add(f'{parsed.scheme}://{parsed.netloc}'.encode())
+                if kind == 'page':
+                    self.article_paths.append(parsed.path)
+        self.base = b''
+    
+    def get(self, path, query):
+        url = self.paths.get(path)
+        if url is None:
+            if not is_listing_path(path):
+                return 404, 'text/plain', b'not found'
+            paths = self.article_paths if int(query.get('page', 1)) == 1 else []
+            links = ''.join(f'<a href="{p}">{p}</a>' for p in paths)
+            return 200, 'text/html', f'<html><body>{links}</body></html>'.encode()
+        status, headers, body = self.archive.read(url)
+        content_type = next((v for k, v in headers.items() if k.lower() == 'content-type'),
+                            'application/octet-stream')
+        if content_type.startswith('text/'):
+            for origin in self.origins:
+                body = body.replace(origin, self.base)
+        return status, content_type, body
+
+def serve(config, ready):
+    """Fixture server process: sends its port and article paths through `ready`, then serves forever"""
+    if config['archive_dir']:
+        site = RecordedSite(config['archive_dir'])
+    else:
+        site = SyntheticSite(config['articles'], config['images'], config['image_size'],
+                             config['seed'])
+    latency = config['latency_ms'] / 1000
+    jitter = config['jitter_ms'] / 1000
+    error_rate = config['error_rate']
+    bandwidth = config['bandwidth_kbps'] * 1024 / 8  # bytes per second, per connection
+    rng = random.Random(config['seed'])
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes, Nagle would add delayed-ACK stalls
+        disable_nagle_algorithm = True
+        
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            query = dict(part.split('=', 1) for part in parsed.query.split('&') if '=' in part)
+            # One shared generator keeps the sequence of injected errors seeded
+            delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+            fail = rng.random() < error_rate
+            time.sleep(delay)
+            if fail:
+                status, content_type, body = 503, 'text/plain', b'injected error'
+            else:
+                status, content_type, body = site.get(parsed.path, query)
+            
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not bandwidth:
+                self.wfile.write(body)
+                return
+            chunk = max(1024, int(bandwidth / 20))
+            for start in range(0, len(body), chunk):
+                self.wfile.write(body[start:start + chunk])
+                time.sleep(len(body[start:start + chunk]) / bandwidth)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    if isinstance(site, RecordedSite):
+        site.base = f'http://127.0.0.1:{server.server_address[1]}'.encode()
+    ready.put((server.server_address[1], site.article_paths))
+    server.serve_forever()
+
+def start_server(config):
+    """Run the fixture server in a child process so its CPU time stays out of the results.
+    
+    Returns the process, its base URL and the set of article paths it serves.
+    """
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(config, ready), daemon=True)
+    process.start()
+    port, article_paths = ready.get(timeout=120)
+    return process, f'http://127.0.0.1:{port}', set(article_paths)
+
+def load_scraper(base_url, workdir):
+    """Import scrape_articles with every output path moved into `workdir`"""
+    os.environ['SCRAPER_BASE_URL'] = base_url
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import scrape_articles as scraper
+    
+    scraper.BASE_URL = base_url
+    scraper.OUTPUT_DIR = workdir / 'scraped-articles'
+    scraper.IMAGES_DIR = workdir / 'images'
+    scraper.INDEX_PATH = workdir / 'scraped-articles.sqlite'
+    scraper.HTTP_CACHE_PATH = workdir / 'http-cache.sqlite'
+    scraper.ARCHIVE_DIR = workdir / 'archive'
+    scraper.REPORT_PATH = workdir / 'report.json'
+    scraper.IMAGE_STORE_DIR = workdir / 'image-store'
+    scraper.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    scraper.IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    return scraper
+
+def process_peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+@contextlib.contextmanager
+def measure(results, stage, verbose=False):
+    """Record wall time and CPU time of the block under results[stage].
+    
+    process_peak_rss_mb is the high-water mark of the whole process so far,
+    not of this stage. While tracemalloc is tracing (--trace-memory) the
+    stage's own Python allocation peak is added as stage_peak_alloc_mb.
+    """
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        allocated = tracemalloc.get_traced_memory()[0]
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    stats = {}
+    with sink:
+        yield stats
+    stats['wall_seconds'] = round(time.perf_counter() - wall, 4)
+    stats['cpu_seconds'] = round(time.process_time() - cpu, 4)
+    if tracing:
+        stats['stage_peak_alloc_mb'] = round((tracemalloc.get_traced_memory()[1] - allocated) / (1024 * 1024), 1)
+    stats['process_peak_rss_mb'] = process_peak_rss_mb()
+    results[stage] = stats
+
+E2E_PATHS = ('OUTPUT_DIR', 'IMAGES_DIR', 'INDEX_PATH', 'IMAGE_STORE_DIR', 'REPORT_PATH')
+
+def served_only(get_article_links, served_paths):
+    """Wrap get_article_links() to drop the fallback URLs the fixture does not serve"""
+    def wrapper(*args, **kwargs):
+        return [url for url in get_article_links(*args, **kwargs) if urlparse(url).path in served_paths]
+    return wrapper
+
+def crawl_end_to_end(scraper, args, served_paths):
+    """Run scrape_articles.main() into a fresh scratch directory, returns the articles saved.
+    
+    Paths and the globals main() sets are put back afterwards so repeated runs
+    start from the same state.
+    """
+    saved = {name: getattr(scraper, name)
+             for name in E2E_PATHS + ('extractor_name', 'image_store', 'crawl_journal', 'get_article_links')}
+    scraper.get_article_links = served_only(scraper.get_article_links, served_paths)
+    workdir = Path(tempfile.mkdtemp(prefix='crawl-', dir=scraper.OUTPUT_DIR.parent))
+    scraper.OUTPUT_DIR = workdir / 'scraped-articles'
+    scraper.IMAGES_DIR = workdir / 'images'
+    scraper.INDEX_PATH = workdir / 'scraped-articles.sqlite'
+    scraper.IMAGE_STORE_DIR = workdir / 'image-store'
+    scraper.REPORT_PATH = workdir / 'report.json'
+    scraper.OUTPUT_DIR.mkdir(parents=True)
+    scraper.IMAGES_DIR.mkdir(parents=True)
+    index = scraper.crawl_index
+    scraper.crawl_index = None
+    try:
+        scraper.main([
+            '--rate', '0', '--image-rate', '0', '--http-cache-mb', '0',
+            '--mongo-dedupe', 'off', '--max-attempts', '1', '--progress-interval', '0',
+            '--concurrency', str(args.concurrency), '--image-workers', str(args.image_workers),
+            '--extractor', args.extractor, '--parse-workers', str(args.parse_workers),
+        ])
+        return scraper.crawl_index.count('url')
+    finally:
+        if scraper.crawl_index is not None:
+            scraper.crawl_index.close()
+        for opened in (scraper.image_store, scraper.crawl_journal):
+            if opened is not None:
+                opened.close()
+        scraper.crawl_index = index
+        for name, value in saved.items():
+            setattr(scraper, name, value)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def run_once(scraper, args, served_paths, verbose=False):
+    """Run each stage once against the fixture server, returns {stage: stats}"""
+    results = {}
+    
+    with measure(results, 'get_article_links', verbose) as stats:
+        urls = scraper.get_article_links(mongo_dedupe='off')
+        # get_article_links() pads short lists with hard-coded fallback URLs the fixture
+        # does not serve, scraping them would only time 404s and count them as errors
+        found = len(urls)
+        urls = [url for url in urls if urlparse(url).path in served_paths]
+        stats['articles'] = len(urls)
+        stats['fallback_urls'] = found - len(urls)
+    
+    with measure(results, 'scrape_article', verbose) as stats:
+        articles = [article for article in map(scraper.scrape_article, urls) if article]
+        stats['articles'] = len(articles)
+        stats['errors'] = len(urls) - len(articles)
+    results['scrape_article']['articles_per_second'] = round(
+        len(articles) / max(results['scrape_article']['wall_seconds'], 1e-9), 2)
+    
+    with measure(results, 'process_images', verbose) as stats:
+        images = sum(len(scraper.plan_images(article)) for article in articles)
+        before = scraper.metrics.report()['counters'].get('bytes_image', 0)
+        for article in articles:
+            scraper.process_images(article)
+        stats['images'] = images
+        stats['image_bytes'] = scraper.metrics.report()['counters'].get('bytes_image', 0) - before
+    results['process_images']['images_per_second'] = round(
+        images / max(results['process_images']['wall_seconds'], 1e-9), 2)
+    
+    if args.end_to_end:
+        with measure(results, 'crawl', verbose) as stats:
+            stats['articles'] = crawl_end_to_end(scraper, args, served_paths)
+        results['crawl']['articles_per_second'] = round(
+            results['crawl']['articles'] / max(results['crawl']['wall_seconds'], 1e-9), 2)
+    
+    return results
+
+def median_results(runs):
+    """Per-stage median of every numeric field across repeated runs"""
+    merged = {}
+    for stage in runs[0]:
+        merged[stage] = {key: round(statistics.median(run[stage][key] for run in runs), 4)
+                         for key in runs[0][stage]}
+    return merged
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    print(f"\n{'stage':<20} {'metric':<22} {'value':>12} {'vs baseline':>12}")
+    for stage, stats in results.items():
+        for key, value in stats.items():
+            delta = ''
+            old = (baseline or {}).get(stage, {}).get(key)
+            if isinstance(old, (int, float)) and old:
+                delta = f'{(value - old) / old * 100:+.1f}%'
+            print(f'{stage:<20} {key:<22} {value:>12} {delta:>12}')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark scrape_articles.py against a local fixture server')
+    parser.add_argument('--articles', type=int, default=DEFAULT_ARTICLES,
+                        help=f'synthetic articles to serve (default: {DEFAULT_ARTICLES})')
+    parser.add_argument('--images', type=int, default=DEFAULT_IMAGES,
+                        help=f'content images per synthetic article (default: {DEFAULT_IMAGES})')
+    parser.add_argument('--image-size', default=DEFAULT_IMAGE_SIZE,
+                        help=f'synthetic image dimensions, WIDTHxHEIGHT (default: {DEFAULT_IMAGE_SIZE})')
+    parser.add_argument('--archive-dir', default=None,
+                        help='serve pages and images recorded with scrape_articles.py --archive instead')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help=f'server response latency (default: {DEFAULT_LATENCY_MS})')
+    parser.add_argument('--jitter-ms', type=float, default=DEFAULT_JITTER_MS,
+                        help=f'random +/- latency jitter (default: {DEFAULT_JITTER_MS})')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0,
+                        help='per-connection bandwidth cap in kilobits per second, 0 for unlimited')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'seed for the corpus, latency and injected errors (default: {DEFAULT_SEED})')
+    parser.add_argument('--extractor', choices=['fast', 'legacy'], default='legacy',
+                        help='article extractor to benchmark (default: legacy)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='run every stage this many times and report medians (default: 1)')
+    parser.add_argument('--end-to-end', action='store_true',
+                        help='also time a full concurrent crawl through scrape_articles.main()')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='page workers for --end-to-end (default: 4)')
+    parser.add_argument('--image-workers', type=int, default=4,
+                        help='image workers for --end-to-end (default: 4)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='parser processes for --end-to-end (default: 0)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="report each stage's peak Python allocations with tracemalloc, "
+                             'slows every stage down so timings are not comparable')
+    parser.add_argument('--output', default=None,
+                        help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=None,
+                        help='results JSON from an earlier run to compare against')
+    parser.add_argument('--verbose', action='store_true',
+                        help="show the scraper's own output")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.archive_dir and not (Path(args.archive_dir) / 'archive.sqlite').exists():
+        print(f'✗ No archive found in {args.archive_dir}, record one with scrape_articles.py --archive')
+        sys.exit(1)
+    config = {
+        'articles': args.articles, 'images': args.images, 'image_size': args.image_size,
+        'archive_dir': args.archive_dir, 'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms, 'error_rate': args.error_rate,
+        'bandwidth_kbps': args.bandwidth_kbps, 'seed': args.seed,
+    }
+    
+    print('Starting fixture server...')
+    server, base_url, served_paths = start_server(config)
+    workdir = Path(tempfile.mkdtemp(prefix='bench-scraper-'))
+    try:
+        print(f'  Serving at {base_url}, scratch files in {workdir}')
+        scraper = load_scraper(base_url, workdir)
+        scraper.extractor_name = args.extractor
+        # Unlimited rate and no listing cache, so only the scraper and the fixture count
+        scraper.configure_http(pool_size=max(args.concurrency, args.image_workers), rate=0,
+                               image_rate=0)
+        scraper.configure_http_cache(0)
+        
+        if args.trace_memory:
+            tracemalloc.start()
+        runs = []
+        for n in range(args.repeat):
+            print(f'Run {n + 1}/{args.repeat}...')
+            shutil.rmtree(scraper.IMAGES_DIR, ignore_errors=True)
+            runs.append(run_once(scraper, args, served_paths, args.verbose))
+        results = median_results(runs)
+    finally:
+        tracemalloc.stop()
+        server.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    config.update(extractor=args.extractor, end_to_end=args.end_to_end, repeat=args.repeat,
+                  trace_memory=args.trace_memory)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        baseline = previous['results']
+        if previous.get('config') != config:
+            print(f'\n  ✗ {args.baseline} was run with different settings, deltas are not comparable')
+    print_results(results, baseline)
+    
+    if args.output:
+        report = {
+            'revision': git_revision(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': config,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'\n✓ Results written to {args.output}')
+    if baseline is not None:
+        print(f'  Compared against {args.baseline}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Offline parity check of scrape_articles.extract_article_fast against the
+reference extract_article on inline HTML fixtures
+
+    python scripts/check_extractors.py
+
+Covers malformed markup, og: meta tags and hero images inside nodes the
+content cleanup removes, ad classes and pages without a content container.
+Every field must match, except that `content` and `excerpt` may differ on
+malformed markup when lxml is installed (see extract_article_fast).
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import scrape_articles as scraper
+
+NAV = '<nav><a href="/articles/nutrition">Nutrition</a></nav>'
+
+FIXTURES = [
+    ('well-formed article', f'''<html><head><title>Plain Page | Muscle & Strength</title>
+<meta property="og:description" content="Plain description">
+<meta property="og:image" content="/images/plain/hero.jpg"></head>
+<body>{NAV}<h1>Plain Page</h1><article><p>First paragraph.</p>
+<img src="/images/plain/one.jpg"><img src="data:image/gif;base64,R0lGOD"><img data-src="/img/placeholder.png">
+<img data-lazy-src="https://cdn.example.com/two.jpg"></article></body></html>'''),
+
+    ('malformed markup', f'''<html><head><title>Broken Page</title></head><body>{NAV}
+<article><p>Unclosed paragraph<p>Another <b>bold <i>nested</b> text</i>
+<td>stray cell</td><div class="post-content"><p>Inner<img src="/images/broken/one.jpg"></div>
+</article><p>After the article</body></html>'''),
+
+    ('og: meta tags inside removed nodes', f'''<html><head><title>Meta Page</title></head><body>{NAV}
+<h1>Meta Page</h1><article><header><meta property="og:description" content="Header description">
+<meta property="og:image" content="/images/meta/header-hero.jpg"></header>
+<footer><meta name="description" content="Footer description"></footer>
+<p>Body paragraph that becomes the excerpt.</p></article></body></html>'''),
+
+    ('ad classes', f'''<html><head><title>Ads Page</title></head><body>{NAV}
+<h1>Ads Page</h1><article><p>Kept paragraph.</p>
+<div class="advertisement"><img src="/images/ads/banner.jpg"><p>Sponsored</p></div>
+<div class="social-share"><img src="/images/ads/share.png"></div>
+<aside class="sidebar-ad-slot"><img src="/images/ads/slot.jpg"></aside>
+<div class="shadow-box"><img src="/images/ads/shadow.jpg"></div>
+<script>track()</script><style>p {{}}</style><img src="/images/ads/kept.jpg"></article></body></html>'''),
+
+    ('hero inside a header', f'''<html><head><title>Hero Page</title></head><body>{NAV}
+<h1>Hero Page</h1><article><header><img class="hero-image" src="/images/hero/in-header.jpg"></header>
+<p>Paragraph.</p><img class="featured" data-src="/images/hero/featured.jpg"></article></body></html>'''),
+
+    ('no content container', '''<html><head><title>Bare Page | Muscle & Strength</title>
+<meta name="description" content="Bare description"></head>
+<body><div class="wrapper"><p>Text outside any container.</p>
+<img class="main-photo" src="/images/bare/photo.jpg"></div></body></html>'''),
+]
+
+def main():
+    failed = 0
+    for label, html in FIXTURES:
+        url = f"{scraper.BASE_URL}/articles/{label.replace(' ', '-').replace(':', '')}"
+        legacy = scraper.extract_article(html.encode('utf-8'), url)
+        fast = scraper.extract_article_fast(html.encode('utf-8'), url)
+        diff = [key for key in legacy if legacy[key] != fast.get(key)]
+        if label == 'malformed markup' and scraper.FAST_PARSER == 'lxml':
+            # lxml repairs broken markup differently, only the structural fields must agree
+            diff = [key for key in diff if key not in ('content', 'excerpt')]
+        print(f'  {"✗" if diff else "✓"} {label}' + (f': {", ".join(diff)} differ' if diff else ''))
+        failed += bool(diff)
+    print(f'\n{len(FIXTURES) - failed} of {len(FIXTURES)} fixtures match (fast extractor parser: {scraper.FAST_PARSER})')
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
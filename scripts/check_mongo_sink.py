@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Offline check of scrape_articles.MongoSink against an in-memory mongomock database
+
+    pip install mongomock pymongo
+    python scripts/check_mongo_sink.py
+
+Covers articles already created by import-scraped-articles.ts (no sourceUrl),
+category resolution, the required categoryId, and failed upserts being
+reported back instead of counted as written.
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import scrape_articles as scraper
+
+def article(slug, title, category_slug='articles', url=None):
+    return {
+        'title': title,
+        'slug': slug,
+        'categorySlug': category_slug,
+        'categoryName': category_slug.title(),
+        'content': f'<article><p>{title}</p></article>',
+        'excerpt': title,
+        'heroImage': '',
+        'images': [],
+        'url': url or f'{scraper.BASE_URL}/articles/{slug}',
+        'scrapedAt': '2024-01-01T00:00:00',
+    }
+
+def main():
+    try:
+        import mongomock
+    except ImportError:
+        print('✗ mongomock is not installed: pip install mongomock pymongo')
+        sys.exit(1)
+    
+    db = mongomock.MongoClient().get_database('strength_guide')
+    db.articles.create_index('slug', unique=True)
+    # As created by import-scraped-articles.ts: no sourceUrl
+    db.articles.insert_one({'title': 'Old title', 'slug': 'imported-article', 'views': 42,
+                            'publishedAt': datetime(2020, 1, 1)})
+    
+    errors = []
+    sink = scraper.MongoSink(db, batch_size=2, flush_interval=60,
+                             on_error=lambda url, message: errors.append(url))
+    sink.write(article('imported-article', 'Re-scraped title'))
+    sink.write(article('fat-loss-basics', 'Fat Loss Basics Explained'))
+    sink.write(article('protein-timing', 'Timing Your Shakes', 'protein'))
+    sink.close()
+    
+    # Change a scraped article's slug to one that already exists
+    failing_url = article('fat-loss-basics', '')['url']
+    sink = scraper.MongoSink(db, batch_size=10, flush_interval=60,
+                             on_error=lambda url, message: errors.append(url))
+    sink.write(article('imported-article', 'Renamed copy', url=failing_url))
+    sink.close()
+    
+    categories = {doc['_id']: doc['slug'] for doc in db.categories.find()}
+    imported = db.articles.find_one({'slug': 'imported-article'})
+    checks = [
+        ('imported article updated in place, not inserted again',
+         db.articles.count_documents({'slug': 'imported-article'}) == 1 and imported['title'] == 'Re-scraped title'),
+        ('sourceUrl backfilled on the imported article',
+         imported.get('sourceUrl') == article('imported-article', '')['url']),
+        ('fields set on insert are kept on update', imported['views'] == 42),
+        ('every article has a categoryId', db.articles.count_documents({'categoryId': {'$exists': False}}) == 0),
+        ('category inferred from the title like the importer',
+         categories[db.articles.find_one({'slug': 'fat-loss-basics'})['categoryId']] == 'fat-loss'),
+        ('category mapped from the scraped slug like the importer',
+         categories[db.articles.find_one({'slug': 'protein-timing'})['categoryId']] == 'nutrition'),
+        ('duplicate slug upsert reported through on_error', errors == [failing_url]),
+        ('three articles in the collection', db.articles.count_documents({}) == 3),
+    ]
+    
+    failed = 0
+    for label, ok in checks:
+        print(f'  {"✓" if ok else "✗"} {label}')
+        failed += not ok
+    print(f'\n{len(checks) - failed} of {len(checks)} checks passed')
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,9 @@ import Tag from '@/models/Tag'
 import Article from '@/models/Article'
 import { readFile, readdir } from 'fs/promises'
 import { join } from 'path'
-import { existsSync } from 'fs'
+import { existsSync, createReadStream } from 'fs'
+import { createGunzip } from 'zlib'
+import { createInterface } from 'readline'
 
 // Article categories from MAS_CATEGORIES_CLEAN.md
 const ARTICLE_CATEGORIES = [
@@ -180,6 +182,51 @@ function inferCategoryFromTitle(title: string): string {
   return bestCategory
 }
 
+interface ScrapedEntry {
+  source: string
+  raw: string
+}
+
+// Per-article JSON files plus any JSONL shards written by `scrape_articles.py --output jsonl`
+async function listScrapedArticles(scrapedDir: string) {
+  const files = (await readdir(scrapedDir)).filter(f => f.endsWith('.json') && f !== 'summary.json')
+  const shardsDir = join(scrapedDir, 'shards')
+  const manifestPath = join(shardsDir, 'manifest.json')
+  const manifest = existsSync(manifestPath)
+    ? JSON.parse(await readFile(manifestPath, 'utf-8'))
+    : { totalArticles: 0, shards: [] }
+
+  async function* entries(): AsyncGenerator<ScrapedEntry> {
+    for (const file of files) {
+      yield { source: file, raw: await readFile(join(scrapedDir, file), 'utf-8') }
+    }
+    for (const shard of manifest.shards as { file: string; committedBytes?: number }[]) {
+      // Stop at the last complete record, anything after it was cut off by a crash
+      if (shard.committedBytes === 0) continue
+      const range = shard.committedBytes ? { end: shard.committedBytes - 1 } : {}
+      let input: NodeJS.ReadableStream = createReadStream(join(shardsDir, shard.file), range)
+      if (shard.file.endsWith('.gz')) {
+        const gunzip = createGunzip()
+        input.on('error', (error) => gunzip.destroy(error))
+        input = input.pipe(gunzip)
+      }
+      let lineNumber = 0
+      try {
+        for await (const line of createInterface({ input, crlfDelay: Infinity })) {
+          lineNumber++
+          if (line.trim()) {
+            yield { source: `${shard.file}:${lineNumber}`, raw: line }
+          }
+        }
+      } catch (error: any) {
+        console.error(`   ✗ Stopped reading ${shard.file} after line ${lineNumber}: ${error.message}`)
+      }
+    }
+  }
+
+  return { total: files.length + manifest.totalArticles, entries: entries() }
+}
+
 async function importScrapedArticles() {
   try {
     console.log('🚀 Starting import of scraped articles...\n')
@@ -233,8 +280,8 @@ async function importScrapedArticles() {
       process.exit(1)
     }
     
-    const files = (await readdir(scrapedDir)).filter(f => f.endsWith('.json') && f !== 'summary.json')
-    console.log(`   Found ${files.length} article files to process\n`)
+    const scraped = await listScrapedArticles(scrapedDir)
+    console.log(`   Found ${scraped.total} scraped articles to process\n`)
     
     // Step 5: Import articles
     console.log('📥 Importing articles...\n')
@@ -243,12 +290,9 @@ async function importScrapedArticles() {
     let errors = 0
     const categoryStats = new Map<string, number>()
     
-    for (let i = 0; i < files.length; i++) {
-      const file = files[i]
+    for await (const { source, raw } of scraped.entries) {
       try {
-        const filePath = join(scrapedDir, file)
-        const content = await readFile(filePath, 'utf-8')
-        const articleData = JSON.parse(content)
+        const articleData = JSON.parse(raw)
         
         // Skip if already exists
         const slug = articleData.slug?.replace(/\.html$/, '') || ''
@@ -301,7 +345,7 @@ async function importScrapedArticles() {
         
         // Progress update
         if (imported % 10 === 0) {
-          process.stdout.write(`   Imported ${imported}/${files.length} articles...\r`)
+          process.stdout.write(`   Imported ${imported}/${scraped.total} articles...\r`)
         }
         
         // Add to existing sets to avoid duplicates in same batch
@@ -313,7 +357,7 @@ async function importScrapedArticles() {
       } catch (error: any) {
         errors++
         if (errors < 10) { // Only show first 10 errors
-          console.error(`\n   ❌ Error importing ${file}: ${error.message}`)
+          console.error(`\n   ❌ Error importing ${source}: ${error.message}`)
         }
       }
     }
@@ -8,12 +8,62 @@ import os
 import json
 import time
 import re
-from urllib.parse import urljoin, urlparse
+import asyncio
+import argparse
+import threading
+import multiprocessing
+import gzip
+import zlib
+import io
+import uuid
+import shutil
+import random
+import email.utils
+from contextlib import contextmanager
+from collections import Counter
+from html import unescape
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+import sqlite3
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 from pathlib import Path
 
-BASE_URL = 'https://www.muscleandstrength.com'
+# SCRAPER_BASE_URL points the scraper at a mirror or a local benchmark server
+BASE_URL = os.environ.get('SCRAPER_BASE_URL', 'https://www.muscleandstrength.com').rstrip('/')
 OUTPUT_DIR = Path(__file__).parent.parent / 'scraped-articles'
 IMAGES_DIR = Path(__file__).parent.parent / 'public' / 'images' / 'articles'
+INDEX_PATH = Path(__file__).parent.parent / 'scraped-articles.sqlite'
+HTTP_CACHE_PATH = Path(__file__).parent.parent / 'scraped-articles.http-cache.sqlite'
+ARCHIVE_DIR = Path(__file__).parent.parent / 'scraped-archive'
+REPORT_PATH = Path(__file__).parent.parent / 'scrape-report.json'
+IMAGE_STORE_DIR = Path(__file__).parent.parent / 'scraped-images'
+
+# Crawl defaults. The rate is per host and matches the old fixed 2s sleep.
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 0.5  # requests per second per host
+DEFAULT_BURST = 1
+DEFAULT_IMAGE_WORKERS = 4
+DEFAULT_IMAGE_RATE = 2.0  # matches the old 0.5s sleep between images
+REQUEST_TIMEOUT = 30
+DEFAULT_HTTP_CACHE_MB = 200
+MAX_HEURISTIC_FRESHNESS = 24 * 3600  # seconds, cap on freshness guessed from Last-Modified
+DEFAULT_SHARD_MB = 64
+MANIFEST_INTERVAL = 5.0  # seconds between shard manifest rewrites
+DEFAULT_MONGO_SINK_BATCH = 100
+DEFAULT_MONGO_SINK_INTERVAL = 10.0  # seconds
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BACKOFF = 5.0  # seconds before the first retry, doubled on each attempt
+MAX_RETRY_DELAY = 600.0
+DEFAULT_PROGRESS_INTERVAL = 10.0  # seconds
+DEFAULT_IMAGE_MAX_WIDTH = 1600  # pixels, optimized copies are never wider
+DEFAULT_IMAGE_QUALITY = 80
+RESPONSIVE_WIDTHS = (480, 960)
+THUMBNAIL_SIZE = (320, 320)
+IMAGE_VARIANTS_DIR = 'variants'  # next to the originals, the Cloudinary uploader skips subfolders
+DEFAULT_NEAR_DUP_DISTANCE = 3  # differing SimHash bits, at most SIMHASH_BANDS - 1
 
 # Create directories
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -34,79 +84,978 @@ session.headers.update({
     'Cache-Control': 'max-age=0',
 })
 
-def get_existing_slugs():
-    """Get slugs of already scraped articles from files and database"""
-    existing_slugs = set()
-    existing_urls = set()
+class Metrics:
+    """Thread-safe counters, gauges and per-stage latency histograms for one run"""
     
-    # Check scraped files
-    scraped_dir = Path(__file__).parent.parent / 'scraped-articles'
-    if scraped_dir.exists():
-        for file in scraped_dir.glob('*.json'):
-            if file.name != 'summary.json':
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        slug = data.get('slug', '').replace('.html', '')
-                        url = data.get('url', '')
-                        if slug:
-                            existing_slugs.add(slug)
-                        if url:
-                            existing_urls.add(url)
-                except:
-                    pass
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    
+    def __init__(self):
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.statuses = {}
+        self.gauges = {}
+        self.gauge_max = {}
+    
+    def observe(self, stage, seconds):
+        with self.lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = {'count': 0, 'sum': 0.0, 'max': 0.0,
+                                                 'buckets': [0] * len(self.BUCKETS)}
+            hist['count'] += 1
+            hist['sum'] += seconds
+            hist['max'] = max(hist['max'], seconds)
+            for n, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    hist['buckets'][n] += 1
+                    break
+    
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+    
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def status(self, code):
+        with self.lock:
+            self.statuses[code] = self.statuses.get(code, 0) + 1
+    
+    def gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+            self.gauge_max[name] = max(self.gauge_max.get(name, 0), value)
+    
+    @staticmethod
+    def _quantile(hist, q):
+        """Upper bucket bound containing the q-th observation"""
+        target = q * hist['count']
+        seen = 0
+        for bound, count in zip(Metrics.BUCKETS, hist['buckets']):
+            seen += count
+            if seen >= target:
+                return min(bound, round(hist['max'], 4))
+        return round(hist['max'], 4)
+    
+    def report(self):
+        with self.lock:
+            elapsed = time.time() - self.started
+            return {
+                'startedAt': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'elapsedSeconds': round(elapsed, 3),
+                'requestsPerSecond': round(self.counters.get('requests', 0) / elapsed, 3) if elapsed else 0,
+                'counters': dict(self.counters),
+                'httpStatuses': {str(code): n for code, n in sorted(self.statuses.items())},
+                'queues': {name: {'current': value, 'max': self.gauge_max[name]}
+                           for name, value in self.gauges.items()},
+                'stages': {
+                    stage: {
+                        'count': hist['count'],
+                        'totalSeconds': round(hist['sum'], 3),
+                        'meanSeconds': round(hist['sum'] / hist['count'], 4) if hist['count'] else 0,
+                        'p50Seconds': self._quantile(hist, 0.5),
+                        'p95Seconds': self._quantile(hist, 0.95),
+                        'maxSeconds': round(hist['max'], 4),
+                        'buckets': dict(zip([str(b) for b in self.BUCKETS], hist['buckets'])),
+                    }
+                    for stage, hist in self.histograms.items()
+                },
+            }
+    
+    def progress_line(self, saved, total):
+        report = self.report()
+        counters = report['counters']
+        queues = ' '.join(f"{name}={q['current']}" for name, q in report['queues'].items())
+        return (f"[progress] {saved}/{total} saved, {counters.get('articles_failed', 0)} failed | "
+                f"{report['requestsPerSecond']:.2f} req/s | "
+                f"{(counters.get('bytes_page', 0) + counters.get('bytes_image', 0)) / 1e6:.1f} MB | "
+                f"rate-limit sleep {counters.get('rate_limit_sleep_seconds', 0):.0f}s | queues {queues}")
+    
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+    
+    def write_prometheus(self, path):
+        """Write a node_exporter textfile collector file"""
+        report = self.report()
+        lines = [
+            '# TYPE scraper_run_duration_seconds gauge',
+            f"scraper_run_duration_seconds {report['elapsedSeconds']}",
+        ]
+        for name, value in report['counters'].items():
+            lines.append(f'# TYPE scraper_{name}_total counter')
+            lines.append(f'scraper_{name}_total {value}')
+        lines.append('# TYPE scraper_http_responses_total counter')
+        lines += [f'scraper_http_responses_total{{status="{code}"}} {n}' for code, n in report['httpStatuses'].items()]
+        lines.append('# TYPE scraper_queue_depth gauge')
+        lines += [f'scraper_queue_depth{{queue="{name}"}} {queue["current"]}' for name, queue in report['queues'].items()]
+        lines.append('# TYPE scraper_queue_depth_max gauge')
+        lines += [f'scraper_queue_depth_max{{queue="{name}"}} {queue["max"]}' for name, queue in report['queues'].items()]
+        lines.append('# TYPE scraper_stage_seconds histogram')
+        with self.lock:
+            histograms = {stage: dict(hist, buckets=list(hist['buckets'])) for stage, hist in self.histograms.items()}
+        for stage, hist in histograms.items():
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS, hist['buckets']):
+                cumulative += count
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {hist["sum"]:.6f}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {hist["count"]}')
+        _write_atomic(path, '\n'.join(lines) + '\n')
+
+def _write_atomic(path, text):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+metrics = Metrics()
+
+class TokenBucket:
+    """Thread-safe token bucket. A rate of 0 or less disables limiting."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            pause = max(0.0, self.paused_until - now)
+            if self.rate <= 0:
+                return pause
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: each caller reserves its own future slot
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return pause
+            return max(pause, -self.tokens / self.rate)
+    
+    def pause(self, seconds):
+        """Hold back every request for `seconds`, e.g. when the host sends Retry-After"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    
+    def acquire(self):
+        """Block until a token is available, returns the time spent waiting"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use"""
+    
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+    
+    def bucket_for(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+    
+    def acquire(self, url):
+        return self.bucket_for(url).acquire()
+    
+    def pause(self, url, seconds):
+        self.bucket_for(url).pause(seconds)
+
+rate_limiter = HostRateLimiter()
+image_rate_limiter = HostRateLimiter(DEFAULT_IMAGE_RATE)
+
+def configure_http(pool_size=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                   image_rate=DEFAULT_IMAGE_RATE):
+    """Size the session connection pool and reset the per-host rate limiters"""
+    global rate_limiter, image_rate_limiter
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    rate_limiter = HostRateLimiter(rate, burst)
+    image_rate_limiter = HostRateLimiter(image_rate, burst)
+
+def pause_host(url, seconds):
+    """Hold back page and image requests to the host of `url`, but not for longer than a retry would wait"""
+    seconds = min(seconds, MAX_RETRY_DELAY)
+    rate_limiter.pause(url, seconds)
+    image_rate_limiter.pause(url, seconds)
+
+class ResponseArchive:
+    """Append-only WARC archive of fetched pages and images.
+    
+    Each run appends to its own responses-<timestamp>.warc.gz, one gzip
+    member per record so the files stay readable by standard WARC tools.
+    archive.sqlite maps each URL to the offset of its latest record so
+    replay can read records directly.
+    """
+    
+    # Requests hands us decoded bodies, so these would no longer be accurate
+    DROP_HEADERS = frozenset(['content-encoding', 'transfer-encoding', 'content-length'])
+    
+    def __init__(self, path=None, readonly=False):
+        self.dir = Path(path or ARCHIVE_DIR)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.dir / 'archive.sqlite'), check_same_thread=False)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS records (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                file TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_kind ON records (kind);
+        ''')
+        self.file = None
+        if not readonly:
+            name = f"responses-{time.strftime('%Y%m%d-%H%M%S')}.warc.gz"
+            self.file = open(self.dir / name, 'ab')
+    
+    def write(self, url, response, body, kind):
+        """Append the response fetched for `url`, `kind` is 'page' or 'image'"""
+        headers = ''.join(
+            f'{name}: {value}\r\n' for name, value in response.headers.items()
+            if name.lower() not in self.DROP_HEADERS)
+        http_block = (f'HTTP/1.1 {response.status_code} {response.reason or ""}\r\n{headers}\r\n'
+                      .encode('utf-8') + body)
+        fetched_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        warc_headers = (
+            'WARC/1.1\r\n'
+            'WARC-Type: response\r\n'
+            f'WARC-Target-URI: {url}\r\n'
+            f'WARC-Date: {fetched_at}\r\n'
+            f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n'
+            f'WARC-Scraper-Kind: {kind}\r\n'
+            'Content-Type: application/http;msgtype=response\r\n'
+            f'Content-Length: {len(http_block)}\r\n\r\n'
+        ).encode('utf-8')
+        record = gzip.compress(warc_headers + http_block + b'\r\n\r\n')
+        
+        with self.lock:
+            offset = self.file.tell()
+            self.file.write(record)
+            self.file.flush()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO records (url, kind, file, offset, length, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, kind, Path(self.file.name).name, offset, len(record), fetched_at))
+            self.conn.commit()
+    
+    def read(self, url):
+        """Return (status, headers, body) of the latest record for `url`, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT file, offset, length FROM records WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        file, offset, length = row
+        with open(self.dir / file, 'rb') as f:
+            f.seek(offset)
+            record = gzip.decompress(f.read(length))
+        
+        _, http_block = record.split(b'\r\n\r\n', 1)
+        head, body = http_block.split(b'\r\n\r\n', 1)
+        lines = head.decode('utf-8').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+        return status, headers, body[:-4]
+    
+    def urls(self, kind):
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                'SELECT url FROM records WHERE kind = ? ORDER BY fetched_at', (kind,))]
+    
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+            self.conn.close()
+
+# Set by main(): record responses into, or replay them from, a ResponseArchive
+response_archive = None
+replay_archive = None
+
+def replay_response(url):
+    """Build a requests.Response for `url` from the replay archive"""
+    record = replay_archive.read(url)
+    if record is None:
+        raise requests.ConnectionError(f'{url} is not in the archive')
+    status, headers, body = record
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    response._content = body
+    response._content_consumed = True
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+def fetch(url, limiter=None, stage='page', **kwargs):
+    """GET a URL through the shared session, respecting the per-host rate limit.
+    
+    In replay mode the response comes from the archive and no request is made.
+    `stage` labels the request in the run metrics.
+    """
+    if replay_archive is not None:
+        return replay_response(url)
+    metrics.inc('rate_limit_sleep_seconds', (limiter or rate_limiter).acquire(url))
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    started = time.perf_counter()
+    try:
+        response = session.get(url, **kwargs)
+    except Exception:
+        metrics.inc('request_errors')
+        raise
+    metrics.observe(f'{stage}_fetch', time.perf_counter() - started)
+    metrics.inc('requests')
+    metrics.status(response.status_code)
+    if not kwargs.get('stream'):
+        metrics.inc(f'bytes_{stage}', len(response.content))
+    return response
+
+class CrawlIndex:
+    """SQLite index of scraped articles, kept next to OUTPUT_DIR.
+    
+    Records slug, URL, content hash, fetch time and status for every article
+    so dedupe checks are indexed lookups instead of a rescan of the JSON files.
+    """
+    
+    def __init__(self, path=None):
+        self.path = Path(path or INDEX_PATH)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                slug TEXT NOT NULL,
+                content_hash TEXT,
+                fetched_at TEXT,
+                status TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_slug ON articles (slug);
+            CREATE TABLE IF NOT EXISTS remote_articles (
+                id TEXT PRIMARY KEY,
+                slug TEXT,
+                url TEXT
+            );
+            CREATE INDEX IF NOT EXISTS remote_articles_slug ON remote_articles (slug);
+            CREATE INDEX IF NOT EXISTS remote_articles_url ON remote_articles (url);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+        self.conn.commit()
+    
+    def record(self, url, slug, status, content=None, fetched_at=None):
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest() if content is not None else None
+        with self.lock:
+            self.conn.execute(
+                '''INSERT INTO articles (url, slug, content_hash, fetched_at, status)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET
+                       slug = excluded.slug,
+                       content_hash = COALESCE(excluded.content_hash, articles.content_hash),
+                       fetched_at = excluded.fetched_at,
+                       -- A failed re-fetch must not hide a copy that is already on disk
+                       status = CASE WHEN excluded.status = 'failed' AND articles.status IN ('saved', 'duplicate')
+                                     THEN articles.status ELSE excluded.status END''',
+                (url, slug.replace('.html', ''), content_hash,
+                 fetched_at or time.strftime('%Y-%m-%dT%H:%M:%S'), status))
+            self.conn.commit()
+    
+    def record_article(self, article, status='saved'):
+        self.record(article['url'], article['slug'], status, article.get('content'), article.get('scrapedAt'))
+    
+    def has(self, column, value, status='saved'):
+        with self.lock:
+            row = self.conn.execute(
+                f'SELECT 1 FROM articles WHERE {column} = ? AND status = ? LIMIT 1', (value, status)).fetchone()
+        return row is not None
+    
+    def known(self, column, value):
+        """True if `value` is a saved article, a skipped near-duplicate or in the database snapshot"""
+        if self.has(column, value) or self.has(column, value, 'duplicate'):
+            return True
+        with self.lock:
+            row = self.conn.execute(
+                f'SELECT 1 FROM remote_articles WHERE {column} = ? LIMIT 1', (value,)).fetchone()
+        return row is not None
+    
+    def count(self, column, status='saved'):
+        with self.lock:
+            return self.conn.execute(
+                f'''SELECT COUNT(*) FROM (
+                       SELECT {column} FROM articles WHERE status = ?
+                       UNION SELECT {column} FROM remote_articles WHERE {column} IS NOT NULL
+                   )''', (status,)).fetchone()[0]
+    
+    def get_state(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+    
+    def set_state(self, key, value):
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO sync_state (key, value) VALUES (?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value', (key, value))
+            self.conn.commit()
     
-    # Check MongoDB database (optional - only if pymongo is available)
+    def upsert_remote(self, rows):
+        """Store (id, slug, url) rows from the database snapshot"""
+        with self.lock:
+            self.conn.executemany(
+                'INSERT INTO remote_articles (id, slug, url) VALUES (?, ?, ?) '
+                'ON CONFLICT (id) DO UPDATE SET slug = excluded.slug, url = excluded.url', rows)
+            self.conn.commit()
+    
+    def clear_remote(self):
+        with self.lock:
+            self.conn.execute('DELETE FROM remote_articles')
+            self.conn.execute("DELETE FROM sync_state WHERE key LIKE 'mongo_%'")
+            self.conn.commit()
+    
+    def fetched_at(self, url):
+        with self.lock:
+            row = self.conn.execute('SELECT fetched_at FROM articles WHERE url = ?', (url,)).fetchone()
+        return row[0] if row else None
+    
+    def is_empty(self):
+        with self.lock:
+            return self.conn.execute('SELECT 1 FROM articles LIMIT 1').fetchone() is None
+    
+    def rebuild_from_files(self, scraped_dir=None):
+        """One-off import of existing JSON files and JSONL shards, used when the index is new"""
+        imported = 0
+        for data in iter_scraped_articles(scraped_dir):
+            slug = data.get('slug', '')
+            url = data.get('url', '')
+            if slug and url:
+                self.record(url, slug, 'saved', data.get('content'), data.get('scrapedAt'))
+                imported += 1
+        return imported
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class KnownSet:
+    """Set-like view over one column of the crawl index and database snapshot"""
+    
+    def __init__(self, index, column):
+        self.index = index
+        self.column = column
+    
+    def __contains__(self, value):
+        return self.index.known(self.column, value)
+    
+    def __len__(self):
+        return self.index.count(self.column)
+
+crawl_index = None
+
+def get_crawl_index(rebuild=False):
+    """Open the crawl index, importing existing output if it is new or `rebuild` is set"""
+    global crawl_index
+    if crawl_index is None:
+        crawl_index = CrawlIndex()
+        rebuild = rebuild or crawl_index.is_empty()
+    if rebuild and OUTPUT_DIR.exists():
+        print(f'  Building crawl index from existing files: {crawl_index.path}')
+        print(f'  Indexed {crawl_index.rebuild_from_files()} articles')
+    return crawl_index
+
+MONGO_BATCH_SIZE = 500
+
+def connect_mongo():
+    """Return (client, db) for MONGODB_URI, or None if pymongo or the URI is missing"""
     try:
+        from pymongo import MongoClient
+        from dotenv import load_dotenv
+    except ImportError:
+        print('  pymongo not available, skipping database check')
+        return None
+    
+    load_dotenv()
+    mongo_uri = os.getenv('MONGODB_URI')
+    if not mongo_uri:
+        return None
+    client = MongoClient(mongo_uri)
+    return client, client.get_database()
+
+def sync_mongo_snapshot(index, full=False):
+    """Pull articles created or updated since the last sync into the index snapshot.
+    
+    The watermark is the highest `_id` and `updatedAt` seen so far, so each
+    run only transfers documents that changed since the previous one.
+    """
+    try:
+        mongo = connect_mongo()
+        if mongo is None:
+            return
+        client, db = mongo
         try:
-            from pymongo import MongoClient
-            import os
-            from dotenv import load_dotenv
-            load_dotenv()
+            from bson import ObjectId
             
-            mongo_uri = os.getenv('MONGODB_URI')
-            if mongo_uri:
-                client = MongoClient(mongo_uri)
-                db = client.get_database()
-                articles_collection = db.get_collection('articles')
-                
-                # Get existing slugs and URLs from database
-                db_slugs = 0
-                db_urls = 0
-                for article in articles_collection.find({}, {'slug': 1, 'sourceUrl': 1}):
+            if full:
+                index.clear_remote()
+            last_id = index.get_state('mongo_last_id')
+            last_updated = index.get_state('mongo_last_updated')
+            
+            query = {}
+            if last_id:
+                clauses = [{'_id': {'$gt': ObjectId(last_id)}}]
+                if last_updated:
+                    clauses.append({'updatedAt': {'$gt': datetime.fromisoformat(last_updated)}})
+                query = {'$or': clauses}
+            
+            cursor = db.get_collection('articles').find(
+                query, {'slug': 1, 'sourceUrl': 1, 'updatedAt': 1}).sort('_id', 1).batch_size(MONGO_BATCH_SIZE)
+            
+            rows = []
+            synced = 0
+            max_id = ObjectId(last_id) if last_id else None
+            max_updated = datetime.fromisoformat(last_updated) if last_updated else None
+            for article in cursor:
+                slug = article['slug'].replace('.html', '') if article.get('slug') else None
+                rows.append((str(article['_id']), slug, article.get('sourceUrl')))
+                synced += 1
+                if max_id is None or article['_id'] > max_id:
+                    max_id = article['_id']
+                updated = article.get('updatedAt')
+                if updated and (max_updated is None or updated > max_updated):
+                    max_updated = updated
+                if len(rows) >= MONGO_BATCH_SIZE:
+                    index.upsert_remote(rows)
+                    rows = []
+            index.upsert_remote(rows)
+            
+            if max_id is not None:
+                index.set_state('mongo_last_id', str(max_id))
+            if max_updated is not None:
+                index.set_state('mongo_last_updated', max_updated.isoformat())
+            print(f'  Synced {synced} new or updated articles from database')
+        finally:
+            client.close()
+    except Exception as e:
+        print(f'  Warning: Could not check database: {e}')
+
+def filter_known_in_mongo(urls):
+    """Drop URLs whose slug or sourceUrl already exists in the database.
+    
+    Runs batched `$in` queries against just the candidate URLs instead of
+    reading the whole collection.
+    """
+    try:
+        mongo = connect_mongo()
+        if mongo is None:
+            return urls
+        client, db = mongo
+        try:
+            articles_collection = db.get_collection('articles')
+            known_slugs = set()
+            known_urls = set()
+            for start in range(0, len(urls), MONGO_BATCH_SIZE):
+                batch = urls[start:start + MONGO_BATCH_SIZE]
+                slugs = [url.rstrip('/').split('/')[-1].replace('.html', '') for url in batch]
+                query = {'$or': [{'slug': {'$in': slugs}}, {'sourceUrl': {'$in': batch}}]}
+                for article in articles_collection.find(query, {'slug': 1, 'sourceUrl': 1}):
                     if article.get('slug'):
-                        slug = article['slug'].replace('.html', '')
-                        if slug not in existing_slugs:
-                            existing_slugs.add(slug)
-                            db_slugs += 1
+                        known_slugs.add(article['slug'].replace('.html', ''))
                     if article.get('sourceUrl'):
-                        url = article['sourceUrl']
-                        if url not in existing_urls:
-                            existing_urls.add(url)
-                            db_urls += 1
-                
-                client.close()
-                print(f'  Found {db_slugs} new slugs and {db_urls} new URLs in database')
-        except ImportError:
-            print('  pymongo not available, skipping database check')
-        except Exception as e:
-            print(f'  Warning: Could not check database: {e}')
+                        known_urls.add(article['sourceUrl'])
+        finally:
+            client.close()
     except Exception as e:
-        print(f'  Warning: Database check failed: {e}')
+        print(f'  Warning: Could not check database: {e}')
+        return urls
+    
+    remaining = [
+        url for url in urls
+        if url not in known_urls and url.rstrip('/').split('/')[-1].replace('.html', '') not in known_slugs
+    ]
+    print(f'  Skipped {len(urls) - len(remaining)} candidates already in database')
+    return remaining
+
+def get_existing_slugs(mongo_dedupe='snapshot'):
+    """Get slugs of already scraped articles from the crawl index and database.
+    
+    In 'snapshot' mode the index's copy of the database is brought up to date
+    first; 'candidates' mode checks the database later, see filter_known_in_mongo().
+    """
+    index = get_crawl_index()
+    if mongo_dedupe in ('snapshot', 'resync'):
+        sync_mongo_snapshot(index, full=mongo_dedupe == 'resync')
+    
+    existing_slugs = KnownSet(index, 'slug')
+    existing_urls = KnownSet(index, 'url')
     
     print(f'  Total existing slugs: {len(existing_slugs)}')
     print(f'  Total existing URLs: {len(existing_urls)}')
     return existing_slugs, existing_urls
 
-def get_article_links():
+def parse_http_date(value):
+    """Timezone-aware datetime from an HTTP date header, or None"""
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def cache_lifetime(headers, ttl=None):
+    """Seconds a response may be reused without asking the server, or None if it must not be stored.
+    
+    Cache-Control max-age wins over Expires. Without either, `ttl` is used
+    if set, otherwise 10% of the time since Last-Modified (the usual
+    heuristic), capped at MAX_HEURISTIC_FRESHNESS.
+    """
+    directives = {}
+    for part in headers.get('Cache-Control', '').lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip('"')
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    age = float(headers['Age']) if headers.get('Age', '').isdigit() else 0.0
+    for name in ('s-maxage', 'max-age'):
+        if directives.get(name, '').isdigit():
+            return max(0.0, float(directives[name]) - age)
+    
+    date = parse_http_date(headers.get('Date')) or datetime.now(timezone.utc)
+    if 'Expires' in headers:
+        # An invalid Expires means already expired
+        expires = parse_http_date(headers['Expires'])
+        return max(0.0, (expires - date).total_seconds()) if expires else 0.0
+    if ttl is not None:
+        return ttl
+    last_modified = parse_http_date(headers.get('Last-Modified'))
+    if last_modified is None:
+        return 0.0
+    return min(MAX_HEURISTIC_FRESHNESS, max(0.0, (date - last_modified).total_seconds() / 10))
+
+class HttpCache:
+    """On-disk cache of listing page bodies for conditional requests.
+    
+    Stores the ETag / Last-Modified validators and the freshness lifetime
+    (see cache_lifetime()) with each body. Fresh entries are served without
+    a request, stale ones are revalidated. The least recently used entries
+    are evicted once the total body size exceeds `max_bytes`.
+    """
+    
+    def __init__(self, path=None, max_bytes=DEFAULT_HTTP_CACHE_MB * 1024 * 1024, ttl=None):
+        self.path = Path(path or HTTP_CACHE_PATH)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL,
+                expires_at REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at);
+        ''')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(responses)')]
+        if 'expires_at' not in columns:
+            # Caches from before freshness was tracked, their entries start out stale
+            self.conn.execute('ALTER TABLE responses ADD COLUMN expires_at REAL NOT NULL DEFAULT 0')
+        self.conn.commit()
+    
+    def get(self, url):
+        """Return (etag, last_modified, body, expires_at) for a cached URL, or None"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT etag, last_modified, body, expires_at FROM responses WHERE url = ?', (url,)).fetchone()
+    
+    def touch(self, url, response=None, last_modified=None):
+        """Mark an entry used, and fresh again if `response` is the 304 that revalidated it"""
+        with self.lock:
+            self.conn.execute('UPDATE responses SET used_at = ? WHERE url = ?', (time.time(), url))
+            if response is not None:
+                headers = requests.structures.CaseInsensitiveDict(response.headers)
+                if last_modified:
+                    headers.setdefault('Last-Modified', last_modified)
+                lifetime = cache_lifetime(headers, self.ttl) or 0.0
+                self.conn.execute('UPDATE responses SET expires_at = ? WHERE url = ?',
+                                  (time.time() + lifetime, url))
+            self.conn.commit()
+    
+    def store(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        lifetime = cache_lifetime(response.headers, self.ttl)
+        if lifetime is None or not (etag or last_modified or lifetime):
+            with self.lock:
+                self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self.conn.commit()
+            return
+        body = response.content
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (url, etag, last_modified, body, size, used_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, body, len(body), time.time(), time.time() + lifetime))
+            self.evict()
+            self.conn.commit()
+    
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes. Caller holds the lock."""
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute('SELECT url, size FROM responses ORDER BY used_at').fetchall():
+            self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+http_cache = None
+
+def configure_http_cache(max_mb=DEFAULT_HTTP_CACHE_MB, ttl=None):
+    """Open the listing page cache, a size of 0 disables it"""
+    global http_cache
+    http_cache = HttpCache(max_bytes=int(max_mb * 1024 * 1024), ttl=ttl) if max_mb > 0 else None
+
+def fetch_cached(url):
+    """GET a page, serving a fresh cached copy without a request and revalidating
+    a stale one with If-None-Match / If-Modified-Since.
+    
+    Returns the body bytes; on 304 Not Modified the cached body is reused.
+    """
+    if http_cache is None:
+        response = fetch(url, stage='listing')
+        response.raise_for_status()
+        return response.content
+    
+    cached = http_cache.get(url)
+    headers = {}
+    if cached:
+        etag, last_modified, body, expires_at = cached
+        if expires_at > time.time():
+            http_cache.touch(url)
+            print('    (fresh in cache)')
+            return body
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    
+    response = fetch(url, stage='listing', headers=headers)
+    if response.status_code == 304 and cached:
+        http_cache.touch(url, response, cached[1])
+        print('    (not modified)')
+        return cached[2]
+    
+    response.raise_for_status()
+    http_cache.store(url, response)
+    return response.content
+
+# Query parameters that only track the visit, dropped when canonicalizing
+TRACKING_PARAMS = frozenset(['_gl', '_ga', 'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref'])
+TRACKING_PREFIXES = ('utm_',)
+# Category, support and paginated pages under /articles/, matched in one pass
+SKIP_URL_RE = re.compile(r'/support\.|/tools/|/workout-plans/|/calculators/|/node/|[?&]ajax=|page=')
+ARTICLE_HREF_RE = re.compile(r'/articles/[^/?#]+')
+CATEGORY_SLUGS = frozenset([
+    'training', 'nutrition', 'workouts', 'supplements',
+    'muscle-building', 'fat-loss', 'women', 'motivation',
+    'lifestyle', 'injury', 'sport', 'recovery', 'interviews',
+    'men', 'abs', 'full-body', 'sports-performance', 'bodyweight',
+    'beginner', 'at-home', 'celebrity', 'cardio', 'chest', 'back',
+    'biceps', 'shoulders', 'legs', 'triceps', 'glutes', 'strength',
+    'protein-shakes', 'protein-bars', 'high-protein', 'low-carb',
+    'snacks', 'vegetarian', 'breakfast', 'lunch', 'dinner', 'bbq-grill',
+    'abductors', 'adductors', 'calves', 'forearms', 'hamstrings',
+    'hip-flexors', 'it-band', 'lats', 'lower-back', 'upper-back',
+    'neck', 'obliques', 'quadriceps', 'traps', 'athlete-profiles',
+    'injury-prevention', 'fitness-lifestyle'
+])
+
+def canonicalize_url(url):
+    """Normalize a link so each page has one spelling, or None if it is not on the site.
+    
+    Relative links are resolved against BASE_URL, http/https and www/bare host
+    variants of the site are mapped onto BASE_URL's origin, the fragment,
+    tracking parameters and any trailing slash are dropped and the remaining
+    query parameters are sorted.
+    """
+    try:
+        parts = urlsplit(urljoin(BASE_URL + '/', url.strip()))
+    except ValueError:
+        # Malformed links such as 'http://[bad/articles/x' (unclosed IPv6 bracket)
+        return None
+    site = urlsplit(BASE_URL)
+    host = (parts.hostname or '').lower()
+    if parts.scheme not in ('http', 'https') or \
+            host.removeprefix('www.') != (site.hostname or '').removeprefix('www.'):
+        return None
+    
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith(TRACKING_PREFIXES)))
+    return urlunsplit((site.scheme, site.netloc, path, query, ''))
+
+def url_slug(url):
+    return urlsplit(url).path.rstrip('/').split('/')[-1].replace('.html', '')
+
+def is_article_url(full_url, slug):
+    """True if an /articles/ URL looks like an article rather than a category or utility page"""
+    if SKIP_URL_RE.search(full_url):
+        return False
+    # Only include if it looks like an actual article (has .html or a slug longer than 8 chars and not a category)
+    return '.html' in full_url or (len(slug) > 8 and slug not in CATEGORY_SLUGS)
+
+def classify_link(href):
+    """Return (canonical URL, slug) for a link to an article, or None for anything else"""
+    url = canonicalize_url(href)
+    if url is None or '/articles/' not in url:
+        return None
+    slug = url_slug(url)
+    if not is_article_url(url, slug):
+        return None
+    # Article pages ignore their query string, keep one URL per article
+    return url.split('?', 1)[0], slug
+
+def parse_w3c_datetime(value):
+    """Parse a sitemap <lastmod> or index timestamp into a naive local datetime, or None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def iter_sitemap(url):
+    """Yield (loc, lastmod) for every <url> in a sitemap, following sitemap indexes.
+    
+    The response is parsed as it streams in and each entry is cleared once
+    read, so memory stays flat however large the sitemap is.
+    """
+    response = fetch(url, stage='sitemap', stream=True)
+    response.raise_for_status()
+    response.raw.decode_content = True
+    # Keep the raw stream open at EOF so the io wrappers below can finish reading
+    response.raw.auto_close = False
+    stream = io.BufferedReader(response.raw)
+    # .xml.gz sitemaps are usually served as plain gzip files, not Content-Encoding
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream)
+    
+    child_sitemaps = []
+    root = None
+    try:
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event != 'end':
+                continue
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag not in ('url', 'sitemap'):
+                continue
+            loc = (elem.findtext('{*}loc') or '').strip()
+            lastmod = elem.findtext('{*}lastmod')
+            if loc:
+                if tag == 'sitemap':
+                    child_sitemaps.append(loc)
+                else:
+                    yield loc, lastmod
+            root.clear()
+    finally:
+        response.close()
+    
+    for child in child_sitemaps:
+        print(f'  Reading: {child}')
+        yield from iter_sitemap(child)
+
+def get_sitemap_links(sitemap_url=None, mongo_dedupe='snapshot'):
+    """Get article URLs from the sitemap, keeping new pages and pages whose <lastmod>
+    is newer than our last fetch"""
+    sitemap_url = sitemap_url or urljoin(BASE_URL, '/sitemap.xml')
+    print(f'Reading sitemap: {sitemap_url}')
+    
+    existing_slugs, existing_urls = get_existing_slugs(mongo_dedupe)
+    index = get_crawl_index()
+    
+    article_urls = []
+    seen_urls = set()
+    new = changed = entries = 0
+    try:
+        for loc, lastmod in iter_sitemap(sitemap_url):
+            entries += 1
+            article = classify_link(loc)
+            if article is None or article[0] in seen_urls:
+                continue
+            loc, slug = article
+            seen_urls.add(loc)
+            
+            if slug in existing_slugs or loc in existing_urls:
+                modified = parse_w3c_datetime(lastmod)
+                fetched = parse_w3c_datetime(index.fetched_at(loc))
+                if not (modified and fetched and modified > fetched):
+                    continue
+                changed += 1
+            else:
+                new += 1
+            article_urls.append(loc)
+    except Exception as e:
+        print(f'  Error reading sitemap: {e}')
+    
+    if mongo_dedupe == 'candidates':
+        article_urls = filter_known_in_mongo(article_urls)
+    
+    print(f'Found {new} new and {changed} updated articles in {entries} sitemap entries\n')
+    return article_urls
+
+def get_article_links(mongo_dedupe='snapshot'):
     """Get list of article URLs to scrape"""
     print('Fetching article list...')
     
     # Get existing slugs and URLs to avoid duplicates
-    existing_slugs, existing_urls = get_existing_slugs()
+    existing_slugs, existing_urls = get_existing_slugs(mongo_dedupe)
     
     article_urls = []
     seen_urls = set()
+    classified = {}
     
     # Focus on Article categories from MAS_CATEGORIES_CLEAN.md
     # Target these specific article categories:
@@ -144,62 +1093,26 @@ def get_article_links():
     for url in pages_to_check:
         try:
             print(f'  Checking: {url}')
-            response = session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(fetch_cached(url), 'html.parser')
             
             # Find article links - focus on /articles/ URLs only (as per user request)
-            links = soup.find_all('a', href=re.compile(r'/articles/[^/?#]+'))
-            for link in links:
+            for link in soup.find_all('a', href=ARTICLE_HREF_RE):
                 href = link.get('href')
-                if href:
-                    # Clean up the URL
-                    if href.startswith('/'):
-                        full_url = urljoin(BASE_URL, href)
-                    elif href.startswith('http'):
-                        full_url = href
-                    else:
-                        continue
-                    
-                    # Extract slug to check if already scraped
-                    slug = full_url.split('/')[-1].replace('.html', '')
-                    
-                    # Skip if already exists (by slug or URL)
-                    if slug in existing_slugs or full_url in existing_urls:
-                        continue
-                    
-                    # Only process /articles/ URLs (focus on article categories)
-                    if '/articles/' in full_url and full_url not in seen_urls:
-                        # Skip category pages, support pages, and other non-article pages
-                        skip_patterns = [
-                            '/support.', '/tools/', '/workout-plans/',
-                            '/calculators/', '/node/',
-                            '?_gl=', '&ajax=', 'page=', '?page='
-                        ]
-                        if not any(pattern in full_url for pattern in skip_patterns):
-                            # Skip known category slugs
-                            category_slugs = [
-                                'training', 'nutrition', 'workouts', 'supplements',
-                                'muscle-building', 'fat-loss', 'women', 'motivation',
-                                'lifestyle', 'injury', 'sport', 'recovery', 'interviews',
-                                'men', 'abs', 'full-body', 'sports-performance', 'bodyweight',
-                                'beginner', 'at-home', 'celebrity', 'cardio', 'chest', 'back',
-                                'biceps', 'shoulders', 'legs', 'triceps', 'glutes', 'strength',
-                                'protein-shakes', 'protein-bars', 'high-protein', 'low-carb',
-                                'snacks', 'vegetarian', 'breakfast', 'lunch', 'dinner', 'bbq-grill',
-                                'abductors', 'adductors', 'calves', 'forearms', 'hamstrings',
-                                'hip-flexors', 'it-band', 'lats', 'lower-back', 'upper-back',
-                                'neck', 'obliques', 'quadriceps', 'traps', 'athlete-profiles',
-                                'injury-prevention', 'fitness-lifestyle'
-                            ]
-                            
-                            # Only include if it looks like an actual article (has .html or a slug longer than 8 chars and not a category)
-                            if '.html' in full_url or (len(slug) > 8 and slug not in category_slugs):
-                                article_urls.append(full_url)
-                                seen_urls.add(full_url)
-                    
-            time.sleep(2)  # Rate limiting
+                # Listing pages repeat the same nav and teaser links, classify each href once
+                if href in classified:
+                    continue
+                article = classified[href] = classify_link(href)
+                if article is None:
+                    continue
+                full_url, slug = article
+                if full_url in seen_urls:
+                    continue
+                seen_urls.add(full_url)
+                
+                # Skip if already exists (by slug or URL)
+                if slug in existing_slugs or full_url in existing_urls:
+                    continue
+                article_urls.append(full_url)
         except Exception as e:
             print(f'  Error fetching {url}: {e}')
             continue
@@ -241,255 +1154,2015 @@ def get_article_links():
                     if len(article_urls) >= 100:
                         break
     
+    if mongo_dedupe == 'candidates':
+        article_urls = filter_known_in_mongo(article_urls)
+    
     print(f'Found {len(article_urls)} new articles to scrape\n')
     # Return all articles, not limited to 100
     return article_urls
 
+class ImageStore:
+    """Content-addressed image store shared by all articles.
+    
+    Blobs live at <dir>/<sha256[:2]>/<sha256><ext> and are hard linked (or
+    copied if linking fails) into each article's image folder. store.sqlite
+    maps source URLs to hashes, so an image that was already fetched is
+    linked without any request, and identical bytes from different URLs
+    are stored once.
+    """
+    
+    def __init__(self, path=None):
+        self.dir = Path(path or IMAGE_STORE_DIR)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.url_locks = {}
+        self.conn = sqlite3.connect(str(self.dir / 'store.sqlite'), check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                ext TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+        self.conn.commit()
+    
+    def lock_for(self, url):
+        """Per-URL lock so concurrent articles sharing an image fetch it once"""
+        with self.lock:
+            return self.url_locks.setdefault(url, threading.Lock())
+    
+    def blob_path(self, digest, ext):
+        return self.dir / digest[:2] / f'{digest}{ext}'
+    
+    def lookup(self, url):
+        """Blob path for a previously stored URL, or None"""
+        with self.lock:
+            row = self.conn.execute('SELECT sha256, ext FROM images WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        blob = self.blob_path(*row)
+        return blob if blob.exists() else None
+    
+    def add(self, url, tmp_path, digest, ext):
+        """Move a downloaded temp file into the store (unless the blob exists) and record the URL"""
+        blob = self.blob_path(digest, ext)
+        if blob.exists():
+            os.unlink(tmp_path)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, blob)
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO images (url, sha256, ext, size) VALUES (?, ?, ?, ?)',
+                (url, digest, ext, blob.stat().st_size))
+            self.conn.commit()
+        return blob
+    
+    @staticmethod
+    def link(blob, filepath):
+        """Point `filepath` at a stored blob"""
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        if filepath.exists():
+            if filepath.samefile(blob):
+                return
+            filepath.unlink()
+        try:
+            os.link(blob, filepath)
+        except OSError:
+            shutil.copyfile(blob, filepath)
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# Set by main(), None stores every article's images separately
+image_store = None
+
 def download_image(img_url, filepath):
-    """Download an image"""
+    """Download an image, reusing the image store copy when there is one"""
     try:
         if not img_url.startswith('http'):
             img_url = urljoin(BASE_URL, img_url)
         
-        response = session.get(img_url, timeout=30, stream=True)
-        response.raise_for_status()
-        
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        if image_store is None:
+            return fetch_image(img_url, filepath)
         
+        with image_store.lock_for(img_url):
+            blob = image_store.lookup(img_url)
+            if blob is None:
+                ext = os.path.splitext(urlparse(img_url).path)[1].lower() or '.jpg'
+                fd, tmp_path = tempfile.mkstemp(dir=image_store.dir, suffix='.part')
+                os.close(fd)
+                try:
+                    digest = fetch_image(img_url, Path(tmp_path))
+                    if not digest:
+                        return False
+                    blob = image_store.add(img_url, tmp_path, digest, ext)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+            image_store.link(blob, filepath)
         return True
     except Exception as e:
         print(f'    ✗ Failed to download image: {e}')
         return False
 
-def scrape_article(url):
-    """Scrape a single article"""
+def fetch_image(img_url, filepath):
+    """Stream an image to `filepath`, returns its sha256 hex digest or None on failure"""
     try:
-        print(f'\nScraping: {url}')
-        response = session.get(url, timeout=30)
+        started = time.perf_counter()
+        response = fetch(img_url, limiter=image_rate_limiter, stage='image', stream=True)
+        if response.status_code in (429, 503):
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after:
+                pause_host(img_url, retry_after)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title_elem = soup.find('h1') or soup.find('title')
-        title = title_elem.get_text(strip=True) if title_elem else 'Untitled Article'
-        title = title.replace(' | Muscle & Strength', '').strip()
+        filepath.parent.mkdir(parents=True, exist_ok=True)
         
-        # Extract category from URL path
-        category_slug = 'general'
-        category_name = 'General'
+        digest = hashlib.sha256()
+        chunks = [] if response_archive else None
+        size = 0
+        # Write beside the target and swap it in: `filepath` may be a hard link
+        # to an image store blob, which must never be written through
+        fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    if chunks is not None:
+                        chunks.append(chunk)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        metrics.inc('bytes_image', size)
+        metrics.observe('image_download', time.perf_counter() - started)
         
-        # Determine category from URL structure
-        url_parts = url.replace(BASE_URL, '').strip('/').split('/')
-        if len(url_parts) >= 2:
-            section = url_parts[0]  # articles, workout-routines, exercises, diet-plans, recipes
-            cat_part = url_parts[1].replace('.html', '') if len(url_parts) > 1 else ''
-            
-            # Map section to category type
-            if section == 'articles':
-                # Try to find category from page
-                category_elem = soup.find('a', href=re.compile(r'/articles/(training|nutrition|supplements|muscle-building|fat-loss|women|motivation|recovery|sports-performance|injury-prevention|fitness-lifestyle|athlete-profiles)'))
-                if category_elem:
-                    cat_href = category_elem.get('href', '')
-                    cat_slug = cat_href.split('/')[-1] if cat_href else cat_part
-                    category_name = category_elem.get_text(strip=True) or cat_slug.replace('-', ' ').title()
-                    category_slug = cat_slug
-                else:
-                    # Default to 'Articles' category
-                    category_slug = 'articles'
-                    category_name = 'Articles'
-            elif section == 'workout-routines':
-                category_slug = 'workouts'
-                category_name = 'Workouts'
-            elif section == 'exercises':
-                category_slug = 'exercises'
-                category_name = 'Exercises'
-            elif section == 'diet-plans':
-                category_slug = 'diet-plans'
-                category_name = 'Diet Plans'
-            elif section == 'recipes':
-                category_slug = 'recipes'
-                category_name = 'Recipes'
+        if chunks is not None:
+            response_archive.write(img_url, response, b''.join(chunks), 'image')
+        return digest.hexdigest()
+    except Exception as e:
+        print(f'    ✗ Failed to download image: {e}')
+        return None
+
+def extract_article(html, url):
+    """Extract an article dict from page HTML (reference html.parser extractor)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Extract title
+    title_elem = soup.find('h1') or soup.find('title')
+    title = title_elem.get_text(strip=True) if title_elem else 'Untitled Article'
+    title = title.replace(' | Muscle & Strength', '').strip()
+    
+    # Extract category from URL path
+    category_slug = 'general'
+    category_name = 'General'
+    
+    # Determine category from URL structure
+    url_parts = url.replace(BASE_URL, '').strip('/').split('/')
+    if len(url_parts) >= 2:
+        section = url_parts[0]  # articles, workout-routines, exercises, diet-plans, recipes
+        cat_part = url_parts[1].replace('.html', '') if len(url_parts) > 1 else ''
         
-        # Also try to find category from page content
-        if category_slug == 'general':
-            category_elem = soup.find('a', href=re.compile(r'/categories/|/category/|/articles/'))
+        # Map section to category type
+        if section == 'articles':
+            # Try to find category from page
+            category_elem = soup.find('a', href=re.compile(r'/articles/(training|nutrition|supplements|muscle-building|fat-loss|women|motivation|recovery|sports-performance|injury-prevention|fitness-lifestyle|athlete-profiles)'))
             if category_elem:
-                category_href = category_elem.get('href', '')
-                if category_href:
-                    cat_slug = category_href.split('/')[-1].replace('.html', '')
-                    if cat_slug and cat_slug not in ['articles', 'workout-routines', 'exercises', 'diet-plans', 'recipes']:
-                        category_slug = cat_slug
-                        category_name = category_elem.get_text(strip=True) or cat_slug.replace('-', ' ').title()
+                cat_href = category_elem.get('href', '')
+                cat_slug = cat_href.split('/')[-1] if cat_href else cat_part
+                category_name = category_elem.get_text(strip=True) or cat_slug.replace('-', ' ').title()
+                category_slug = cat_slug
+            else:
+                # Default to 'Articles' category
+                category_slug = 'articles'
+                category_name = 'Articles'
+        elif section == 'workout-routines':
+            category_slug = 'workouts'
+            category_name = 'Workouts'
+        elif section == 'exercises':
+            category_slug = 'exercises'
+            category_name = 'Exercises'
+        elif section == 'diet-plans':
+            category_slug = 'diet-plans'
+            category_name = 'Diet Plans'
+        elif section == 'recipes':
+            category_slug = 'recipes'
+            category_name = 'Recipes'
+    
+    # Also try to find category from page content
+    if category_slug == 'general':
+        category_elem = soup.find('a', href=re.compile(r'/categories/|/category/|/articles/'))
+        if category_elem:
+            category_href = category_elem.get('href', '')
+            if category_href:
+                cat_slug = category_href.split('/')[-1].replace('.html', '')
+                if cat_slug and cat_slug not in ['articles', 'workout-routines', 'exercises', 'diet-plans', 'recipes']:
+                    category_slug = cat_slug
+                    category_name = category_elem.get_text(strip=True) or cat_slug.replace('-', ' ').title()
+    
+    # Extract content
+    content_elem = (
+        soup.find('article') or
+        soup.find('div', class_=re.compile(r'article-content|post-content|entry-content')) or
+        soup.find('main') or
+        soup.find('div', class_='content')
+    )
+    
+    content = ''
+    if content_elem:
+        # Remove unwanted elements
+        for elem in content_elem.find_all(['script', 'style', 'nav', 'header', 'footer']):
+            elem.decompose()
         
-        # Extract content
-        content_elem = (
-            soup.find('article') or
-            soup.find('div', class_=re.compile(r'article-content|post-content|entry-content')) or
-            soup.find('main') or
-            soup.find('div', class_='content')
-        )
+        # Remove ads
+        for elem in content_elem.find_all(class_=re.compile(r'ad|advertisement|social-share')):
+            elem.decompose()
         
-        content = ''
-        if content_elem:
-            # Remove unwanted elements
-            for elem in content_elem.find_all(['script', 'style', 'nav', 'header', 'footer']):
-                elem.decompose()
-            
-            # Remove ads
-            for elem in content_elem.find_all(class_=re.compile(r'ad|advertisement|social-share')):
-                elem.decompose()
-            
-            content = str(content_elem)
+        content = str(content_elem)
+    
+    # Extract excerpt
+    excerpt = ''
+    meta_desc = soup.find('meta', property='og:description') or soup.find('meta', attrs={'name': 'description'})
+    if meta_desc:
+        excerpt = meta_desc.get('content', '')
+    elif content_elem:
+        first_p = content_elem.find('p')
+        if first_p:
+            excerpt = first_p.get_text(strip=True)[:200]
+    
+    # Extract hero image
+    hero_image = ''
+    og_image = soup.find('meta', property='og:image')
+    if og_image:
+        hero_image = og_image.get('content', '')
+    else:
+        hero_img = soup.find('img', class_=re.compile(r'hero|featured|main'))
+        if hero_img:
+            hero_image = hero_img.get('src') or hero_img.get('data-src', '')
+    
+    # Extract all images from content
+    images = []
+    if content_elem:
+        for img in content_elem.find_all('img'):
+            src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+            if src and not src.startswith('data:') and 'placeholder' not in src.lower():
+                if not src.startswith('http'):
+                    src = urljoin(BASE_URL, src)
+                images.append(src)
+    
+    # Generate slug from URL
+    slug = url.split('/')[-1] or url.split('/')[-2]
+    
+    return {
+        'title': title,
+        'slug': slug,
+        'categorySlug': category_slug,
+        'categoryName': category_name,
+        'content': content,
+        'excerpt': excerpt,
+        'heroImage': hero_image,
+        'images': images,
+        'url': url,
+    }
+
+# Precompiled selectors for extract_article_fast()
+CATEGORY_LINK_RE = re.compile(r'/articles/(training|nutrition|supplements|muscle-building|fat-loss|women|motivation|recovery|sports-performance|injury-prevention|fitness-lifestyle|athlete-profiles)')
+GENERIC_CATEGORY_LINK_RE = re.compile(r'/categories/|/category/|/articles/')
+CONTENT_CLASS_RE = re.compile(r'article-content|post-content|entry-content')
+AD_CLASS_RE = re.compile(r'ad|advertisement|social-share')
+HERO_CLASS_RE = re.compile(r'hero|featured|main')
+STRIP_TAGS = frozenset(['script', 'style', 'nav', 'header', 'footer'])
+SECTION_CATEGORIES = {
+    'workout-routines': ('workouts', 'Workouts'),
+    'exercises': ('exercises', 'Exercises'),
+    'diet-plans': ('diet-plans', 'Diet Plans'),
+    'recipes': ('recipes', 'Recipes'),
+}
+GENERIC_SECTIONS = frozenset(['articles', 'workout-routines', 'exercises', 'diet-plans', 'recipes'])
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+def _class_matches(tag, pattern):
+    classes = tag.get('class')
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        classes = [classes]
+    return any(pattern.search(c) for c in classes)
+
+def _first_live(tags):
+    """First tag that was not removed during content cleanup"""
+    for tag in tags:
+        if not tag.decomposed:
+            return tag
+    return None
+
+def extract_article_fast(html, url):
+    """Extract an article dict like extract_article() with one parse and one document pass.
+    
+    Uses lxml when installed and precompiled patterns, and finds every element
+    the reference extractor looks up with separate soup.find() calls in a
+    single walk over the tree. lxml repairs malformed markup differently from
+    html.parser (unclosed <p> tags, stray table tags), so `content` and
+    `excerpt` can differ from the reference extractor on such pages. Compare
+    them offline on archived pages with --replay --check-extractors, and on
+    fixed fixtures with scripts/check_extractors.py.
+    """
+    soup = BeautifulSoup(html, FAST_PARSER)
+    
+    h1 = title_tag = category_link = generic_link = None
+    article_tag = content_div = main_tag = plain_content_div = None
+    og_description = []
+    meta_description = []
+    og_image = []
+    hero_imgs = []
+    
+    for tag in soup.descendants:
+        name = tag.name
+        if name is None:
+            continue
+        if name == 'a':
+            href = tag.get('href')
+            if href:
+                if category_link is None and CATEGORY_LINK_RE.search(href):
+                    category_link = tag
+                if generic_link is None and GENERIC_CATEGORY_LINK_RE.search(href):
+                    generic_link = tag
+        elif name == 'meta':
+            prop = tag.get('property')
+            if prop == 'og:description':
+                og_description.append(tag)
+            elif prop == 'og:image':
+                og_image.append(tag)
+            if tag.get('name') == 'description':
+                meta_description.append(tag)
+        elif name == 'img':
+            if _class_matches(tag, HERO_CLASS_RE):
+                hero_imgs.append(tag)
+        elif name == 'div':
+            if content_div is None and _class_matches(tag, CONTENT_CLASS_RE):
+                content_div = tag
+            if plain_content_div is None and 'content' in (tag.get('class') or ()):
+                plain_content_div = tag
+        elif name == 'h1':
+            h1 = h1 or tag
+        elif name == 'title':
+            title_tag = title_tag or tag
+        elif name == 'article':
+            article_tag = article_tag or tag
+        elif name == 'main':
+            main_tag = main_tag or tag
+    
+    # Extract title
+    title_elem = h1 or title_tag
+    title = title_elem.get_text(strip=True) if title_elem else 'Untitled Article'
+    title = title.replace(' | Muscle & Strength', '').strip()
+    
+    # Determine category from URL structure
+    category_slug = 'general'
+    category_name = 'General'
+    url_parts = url.replace(BASE_URL, '').strip('/').split('/')
+    if len(url_parts) >= 2:
+        section = url_parts[0]
+        cat_part = url_parts[1].replace('.html', '')
+        if section == 'articles':
+            if category_link:
+                cat_href = category_link.get('href', '')
+                category_slug = cat_href.split('/')[-1] if cat_href else cat_part
+                category_name = category_link.get_text(strip=True) or category_slug.replace('-', ' ').title()
+            else:
+                category_slug = 'articles'
+                category_name = 'Articles'
+        elif section in SECTION_CATEGORIES:
+            category_slug, category_name = SECTION_CATEGORIES[section]
+    
+    if category_slug == 'general' and generic_link:
+        category_href = generic_link.get('href', '')
+        if category_href:
+            cat_slug = category_href.split('/')[-1].replace('.html', '')
+            if cat_slug and cat_slug not in GENERIC_SECTIONS:
+                category_slug = cat_slug
+                category_name = generic_link.get_text(strip=True) or cat_slug.replace('-', ' ').title()
+    
+    # Clean the content container and collect its images in one walk
+    content_elem = article_tag or content_div or main_tag or plain_content_div
+    content = ''
+    first_p = None
+    content_imgs = []
+    if content_elem:
+        removed = []
+        stack = [iter(content_elem.children)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if not hasattr(child, 'children'):
+                continue
+            if child.name in STRIP_TAGS or _class_matches(child, AD_CLASS_RE):
+                removed.append(child)
+                continue
+            if child.name == 'img':
+                content_imgs.append(child)
+            elif child.name == 'p' and first_p is None:
+                first_p = child
+            stack.append(iter(child.children))
+        for elem in removed:
+            elem.decompose()
+        content = str(content_elem)
+    
+    # Extract excerpt
+    excerpt = ''
+    meta_desc = _first_live(og_description) or _first_live(meta_description)
+    if meta_desc:
+        excerpt = meta_desc.get('content', '')
+    elif first_p:
+        excerpt = first_p.get_text(strip=True)[:200]
+    
+    # Extract hero image
+    hero_image = ''
+    og_image_tag = _first_live(og_image)
+    if og_image_tag:
+        hero_image = og_image_tag.get('content', '')
+    else:
+        hero_img = _first_live(hero_imgs)
+        if hero_img:
+            hero_image = hero_img.get('src') or hero_img.get('data-src', '')
+    
+    images = []
+    for img in content_imgs:
+        src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+        if src and not src.startswith('data:') and 'placeholder' not in src.lower():
+            if not src.startswith('http'):
+                src = urljoin(BASE_URL, src)
+            images.append(src)
+    
+    slug = url.split('/')[-1] or url.split('/')[-2]
+    
+    return {
+        'title': title,
+        'slug': slug,
+        'categorySlug': category_slug,
+        'categoryName': category_name,
+        'content': content,
+        'excerpt': excerpt,
+        'heroImage': hero_image,
+        'images': images,
+        'url': url,
+    }
+
+EXTRACTORS = {
+    'legacy': extract_article,
+    'fast': extract_article_fast,
+}
+extractor_name = 'legacy'
+
+def extract_with(name, html, url):
+    """Run the named extractor. Module-level so it can be sent to a process pool."""
+    return EXTRACTORS[name](html, url)
+
+def init_parse_worker(base_url):
+    """Process pool initializer: carry over settings a fresh interpreter would not have"""
+    global BASE_URL
+    BASE_URL = base_url
+
+def make_parse_pool(workers):
+    """Process pool for CPU-bound extraction, or None to parse on the fetch threads"""
+    if workers < 1:
+        return None
+    # spawn rather than fork: the parent already runs fetch threads holding session locks
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_parse_worker, initargs=(BASE_URL,))
+
+class FetchError(Exception):
+    """A page fetch failed. `transient` errors are worth retrying, after at least `retry_after` seconds."""
+    
+    def __init__(self, message, transient=False, retry_after=None):
+        super().__init__(message)
+        self.transient = transient
+        self.retry_after = retry_after
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    retry_at = parse_http_date(value)
+    if retry_at is None:
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def fetch_page(url):
+    """Fetch an article page and return the raw body, raises FetchError on failure"""
+    print(f'\nScraping: {url}')
+    try:
+        response = fetch(url)
+    except (requests.Timeout, requests.ConnectionError) as e:
+        raise FetchError(str(e), transient=replay_archive is None) from e
+    
+    if response.status_code in RETRY_STATUSES:
+        retry_after = None
+        if response.status_code in (429, 503):
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after:
+                # Back off the whole host, not just this URL
+                pause_host(url, retry_after)
+        raise FetchError(f'HTTP {response.status_code}', transient=True, retry_after=retry_after)
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        raise FetchError(str(e)) from e
+    
+    if response_archive:
+        response_archive.write(url, response, response.content, 'page')
+    return response.content
+
+def scrape_article(url):
+    """Scrape a single article"""
+    try:
+        return extract_with(extractor_name, fetch_page(url), url)
+    except Exception as e:
+        print(f'  ✗ Error scraping article: {e}')
+        return None
+
+def check_extractor_parity(urls):
+    """Run both extractors on each page and report differing fields and parse time"""
+    timings = {name: 0.0 for name in EXTRACTORS}
+    mismatches = 0
+    for url in urls:
+        try:
+            response = fetch(url)
+            response.raise_for_status()
+        except Exception as e:
+            print(f'  ✗ Error fetching {url}: {e}')
+            continue
         
-        # Extract excerpt
-        excerpt = ''
-        meta_desc = soup.find('meta', property='og:description') or soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            excerpt = meta_desc.get('content', '')
-        elif content_elem:
-            first_p = content_elem.find('p')
-            if first_p:
-                excerpt = first_p.get_text(strip=True)[:200]
+        results = {}
+        for name, extractor in EXTRACTORS.items():
+            started = time.perf_counter()
+            results[name] = extractor(response.content, url)
+            timings[name] += time.perf_counter() - started
         
-        # Extract hero image
-        hero_image = ''
-        og_image = soup.find('meta', property='og:image')
-        if og_image:
-            hero_image = og_image.get('content', '')
+        diff = [key for key in results['legacy'] if results['legacy'][key] != results['fast'].get(key)]
+        if diff:
+            mismatches += 1
+            print(f'  ✗ {url}: {", ".join(diff)} differ')
         else:
-            hero_img = soup.find('img', class_=re.compile(r'hero|featured|main'))
-            if hero_img:
-                hero_image = hero_img.get('src') or hero_img.get('data-src', '')
+            print(f'  ✓ {url}')
+    
+    print(f'\n{mismatches} of {len(urls)} pages differ')
+    for name, seconds in timings.items():
+        print(f'  {name}: {seconds:.2f}s parsing')
+    return mismatches
+
+def plan_images(article):
+    """List the image downloads for an article as (kind, index, url, filepath, new_path) jobs"""
+    article_dir = IMAGES_DIR / article['categorySlug'] / article['slug']
+    base_path = f"/images/articles/{article['categorySlug']}/{article['slug']}"
+    
+    jobs = []
+    if article['heroImage']:
+        ext = os.path.splitext(urlparse(article['heroImage']).path)[1] or '.jpg'
+        filename = f'hero{ext}'
+        jobs.append(('hero', 0, article['heroImage'], article_dir / filename, f'{base_path}/{filename}'))
+    
+    for i, img_url in enumerate(article['images'], 1):
+        ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
+        filename = f'image-{i}{ext}'
+        jobs.append(('image', i, img_url, article_dir / filename, f'{base_path}/{filename}'))
+    
+    return jobs
+
+IMAGE_URL_ATTRS = ('src', 'data-src', 'data-lazy-src')
+IMAGE_SRCSET_ATTRS = ('srcset', 'data-srcset', 'data-lazy-srcset')
+
+def rewrite_image_urls(html, image_map):
+    """Map every image-bearing attribute in `html` through image_map.
+    
+    Parses the content once, rewrites src/data-src/data-lazy-src and each
+    candidate in srcset-style attributes on <img> and <source> tags, and
+    serializes once. Relative URLs are resolved against BASE_URL for lookup.
+    """
+    if not html or not image_map:
+        return html
+    
+    def local(value):
+        value = value.strip()
+        return image_map.get(value) or image_map.get(urljoin(BASE_URL, value))
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    changed = False
+    for tag in soup.find_all(['img', 'source']):
+        for attr in IMAGE_URL_ATTRS:
+            value = tag.get(attr)
+            new_path = local(value) if value else None
+            if new_path:
+                tag[attr] = new_path
+                changed = True
+        for attr in IMAGE_SRCSET_ATTRS:
+            value = tag.get(attr)
+            if not value:
+                continue
+            candidates = []
+            for candidate in value.split(','):
+                parts = candidate.split(None, 1)
+                if not parts:
+                    continue
+                new_path = local(parts[0])
+                if new_path:
+                    parts[0] = new_path
+                    changed = True
+                candidates.append(' '.join(parts))
+            tag[attr] = ', '.join(candidates)
+    
+    return str(soup) if changed else html
+
+def optimize_image(src, image_format, max_width, widths, quality):
+    """Write resized `image_format` copies of the image at `src` into its
+    IMAGE_VARIANTS_DIR subfolder.
+    
+    Produces <stem>.opt.<ext> capped at `max_width`, <stem>-<w>w.<ext> for
+    each smaller responsive width and <stem>-thumb.<ext>, and returns their
+    file names with the source and output dimensions. `src` itself is never
+    written, it may be a hard link to an image store blob, and each copy is
+    saved to a temp file and moved into place for the same reason. Animated
+    images are left alone and return None. Module-level so it can be sent
+    to a process pool.
+    """
+    from PIL import Image, ImageOps
+    
+    src = Path(src)
+    ext = '.' + image_format.lower()
+    with Image.open(src) as original:
+        if getattr(original, 'is_animated', False):
+            return None
+        image = ImageOps.exif_transpose(original)
+        transparent = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if transparent else 'RGB')
+    
+    width, height = image.size
+    variants_dir = src.parent / IMAGE_VARIANTS_DIR
+    variants_dir.mkdir(exist_ok=True)
+    
+    def save(copy, name):
+        fd, tmp_path = tempfile.mkstemp(dir=variants_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                copy.save(f, image_format, quality=quality)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, variants_dir / name)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return {'file': name, 'width': copy.width, 'height': copy.height}
+    
+    def resized(target):
+        if target >= width:
+            return image
+        return image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+    
+    capped = save(resized(min(width, max_width)), f'{src.stem}.opt{ext}')
+    srcset = [save(resized(w), f'{src.stem}-{w}w{ext}') for w in widths if w < capped['width']]
+    thumbnail = image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE, Image.LANCZOS)
+    return {
+        'width': width,
+        'height': height,
+        'optimized': capped,
+        'srcset': srcset + [capped],
+        'thumbnail': save(thumbnail, f'{src.stem}-thumb{ext}'),
+    }
+
+class ImageOptimizer:
+    """Process pool that writes optimized copies of downloaded images.
+    
+    The image_variants table in the crawl index file maps the sha256 of a
+    source image and the optimizer settings to the copies made from it, so
+    an image is only decoded and encoded once: unchanged images are skipped
+    on later runs, and the same image saved for another article gets links
+    to the existing copies.
+    """
+    
+    def __init__(self, workers=None, image_format='WEBP', max_width=DEFAULT_IMAGE_MAX_WIDTH,
+                 quality=DEFAULT_IMAGE_QUALITY, path=None):
+        self.image_format = image_format
+        self.max_width = max_width
+        self.quality = quality
+        # spawn for the same reason as make_parse_pool()
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                        mp_context=multiprocessing.get_context('spawn'))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path or INDEX_PATH), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(image_variants)')]
+        if 'path' in columns:
+            # Keyed by article path in earlier versions, the copies are found again by hash
+            self.conn.execute('DROP TABLE image_variants')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS image_variants (
+                sha256 TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                source TEXT NOT NULL,
+                meta TEXT NOT NULL,
+                PRIMARY KEY (sha256, settings)
+            )
+        ''')
+        self.conn.commit()
+    
+    @property
+    def settings(self):
+        return f'{self.image_format}:{self.max_width}:{self.quality}:{RESPONSIVE_WIDTHS}:{THUMBNAIL_SIZE}'
+    
+    def optimize(self, filepath):
+        """Return variant metadata for a downloaded image, or None if it is not optimized"""
+        filepath = Path(filepath)
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
         
-        # Extract all images from content
-        images = []
-        if content_elem:
-            for img in content_elem.find_all('img'):
-                src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                if src and not src.startswith('data:') and 'placeholder' not in src.lower():
-                    if not src.startswith('http'):
-                        src = urljoin(BASE_URL, src)
-                    images.append(src)
+        with self.lock:
+            row = self.conn.execute('SELECT source, meta FROM image_variants WHERE sha256 = ? AND settings = ?',
+                                    (digest, self.settings)).fetchone()
+        if row:
+            meta = json.loads(row[1])
+            # Stored as null for animated images, which are never optimized
+            animated = meta is None
+            if not animated:
+                meta = self._reuse(Path(row[0]), meta, filepath)
+            if animated or meta is not None:
+                metrics.inc('images_optimize_skipped')
+                return meta
         
-        # Generate slug from URL
-        slug = url.split('/')[-1] or url.split('/')[-2]
+        with metrics.timer('image_optimize'):
+            meta = self.pool.submit(optimize_image, str(filepath), self.image_format, self.max_width,
+                                    RESPONSIVE_WIDTHS, self.quality).result()
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO image_variants (sha256, settings, source, meta) VALUES (?, ?, ?, ?)',
+                (digest, self.settings, str(filepath), json.dumps(meta)))
+            self.conn.commit()
+        return meta
+    
+    @staticmethod
+    def _reuse(source, meta, filepath):
+        """Link the copies made from `source` next to `filepath`, renamed for its stem.
         
-        return {
-            'title': title,
-            'slug': slug,
-            'categorySlug': category_slug,
-            'categoryName': category_name,
-            'content': content,
-            'excerpt': excerpt,
-            'heroImage': hero_image,
-            'images': images,
-            'url': url,
-        }
-    except Exception as e:
-        print(f'  ✗ Error scraping article: {e}')
+        Returns the metadata with the new file names, or None if any copy is gone.
+        """
+        def renamed(variant):
+            return dict(variant, file=filepath.stem + variant['file'][len(source.stem):])
+        
+        variants = [meta['optimized'], meta['thumbnail']] + meta['srcset']
+        source_dir = source.parent / IMAGE_VARIANTS_DIR
+        if not all((source_dir / variant['file']).exists() for variant in variants):
+            return None
+        if source != filepath:
+            for variant in variants:
+                ImageStore.link(source_dir / variant['file'],
+                                filepath.parent / IMAGE_VARIANTS_DIR / renamed(variant)['file'])
+        return dict(meta, optimized=renamed(meta['optimized']), thumbnail=renamed(meta['thumbnail']),
+                    srcset=[renamed(variant) for variant in meta['srcset']])
+    
+    def close(self):
+        self.pool.shutdown(wait=True)
+        with self.lock:
+            self.conn.close()
+
+# Set by main(), None keeps the downloaded originals only
+image_optimizer = None
+
+def make_image_optimizer(workers, image_format, max_width, quality):
+    """Start an ImageOptimizer, or return None if Pillow or its `image_format` encoder is missing"""
+    try:
+        from PIL import features
+    except ImportError:
+        print('  Pillow not available, skipping image optimization')
         return None
+    if not features.check(image_format.lower()):
+        print(f'  Pillow was built without {image_format} support, skipping image optimization')
+        return None
+    return ImageOptimizer(workers, image_format.upper(), max_width, quality)
+
+def apply_images(article, jobs, results):
+    """Point the article at the local copies of successfully downloaded images.
+    
+    Optimized images are referenced through their capped copy, and their
+    dimensions, responsive widths and thumbnail are listed in imageVariants.
+    """
+    image_map = {}
+    content_map = {}
+    variants = []
+    for (kind, i, img_url, filepath, new_path), ok in zip(jobs, results):
+        if not ok:
+            continue
+        if isinstance(ok, dict):
+            base_path = f"{new_path.rsplit('/', 1)[0]}/{IMAGE_VARIANTS_DIR}"
+            variants.append({
+                'kind': kind,
+                'original': new_path,
+                'width': ok['width'],
+                'height': ok['height'],
+                'src': f"{base_path}/{ok['optimized']['file']}",
+                'srcset': [{'src': f"{base_path}/{variant['file']}", 'width': variant['width'],
+                            'height': variant['height']} for variant in ok['srcset']],
+                'thumbnail': f"{base_path}/{ok['thumbnail']['file']}",
+            })
+            new_path = variants[-1]['src']
+        image_map[img_url] = new_path
+        if kind == 'hero':
+            article['heroImage'] = new_path
+        else:
+            content_map[img_url] = new_path
+    
+    # Update content HTML
+    article['content'] = rewrite_image_urls(article['content'], content_map)
+    if variants:
+        article['imageVariants'] = variants
+    return image_map
+
+def download_job(article, job):
+    """Run one image job, returns False if the image could not be saved, otherwise
+    its optimized variants from image_optimizer or True"""
+    kind, i, img_url, filepath, new_path = job
+    label = 'hero image' if kind == 'hero' else f'image {i}'
+    try:
+        if not download_image(img_url, filepath):
+            return False
+        if kind == 'hero':
+            print(f'  ✓ Downloaded hero image')
+        else:
+            print(f'  ✓ Downloaded image {i}/{len(article["images"])}')
+    except Exception as e:
+        print(f'  ✗ Failed to process {label}: {e}')
+        return False
+    
+    if image_optimizer is None:
+        return True
+    try:
+        # Blocks this download thread while a pool process encodes, which also bounds the backlog
+        return image_optimizer.optimize(filepath) or True
+    except Exception as e:
+        print(f'  ✗ Failed to optimize {label}, keeping the original: {e}')
+        return True
 
 def process_images(article):
     """Download and process images for an article"""
-    category_dir = IMAGES_DIR / article['categorySlug']
-    article_dir = category_dir / article['slug']
-    article_dir.mkdir(parents=True, exist_ok=True)
+    jobs = plan_images(article)
+    results = [download_job(article, job) for job in jobs]
+    return apply_images(article, jobs, results)
+
+class ImagePipeline:
+    """Bounded pool of image download workers fed by a queue.
     
-    image_map = {}
+    Articles are submitted as soon as they are parsed and handed to
+    `on_done` once every one of their images has settled, so page
+    fetches for the next article overlap with image fetches for this one.
+    """
     
-    # Process hero image
-    if article['heroImage']:
+    def __init__(self, executor, on_done, workers=DEFAULT_IMAGE_WORKERS, maxsize=None):
+        self.executor = executor
+        self.on_done = on_done
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=maxsize or workers * 4)
+        self.tasks = []
+    
+    def start(self):
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def submit(self, article):
+        """Queue an article's images, waits while the queue is full"""
+        jobs = plan_images(article)
+        if not jobs:
+            self.on_done(article)
+            return
+        
+        print(f'  Queued {len(jobs)} images...')
+        state = {'article': article, 'jobs': jobs, 'results': [False] * len(jobs), 'pending': len(jobs)}
+        for n in range(len(jobs)):
+            await self.queue.put((state, n))
+            metrics.gauge('images', self.queue.qsize())
+    
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            state, n = await self.queue.get()
+            metrics.gauge('images', self.queue.qsize())
+            try:
+                state['results'][n] = await loop.run_in_executor(
+                    self.executor, download_job, state['article'], state['jobs'][n])
+                state['pending'] -= 1
+                if state['pending'] == 0:
+                    apply_images(state['article'], state['jobs'], state['results'])
+                    self.on_done(state['article'])
+            except Exception as e:
+                print(f'  ✗ Image pipeline error: {e}')
+            finally:
+                self.queue.task_done()
+    
+    async def close(self):
+        """Wait for all queued images to settle and stop the workers"""
+        await self.queue.join()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+class JsonFileSink:
+    """One pretty-printed JSON file per article, the layout the TS import scripts read"""
+    
+    def __init__(self, directory=None):
+        self.dir = Path(directory or OUTPUT_DIR)
+    
+    def write(self, article):
+        json_path = self.dir / f"{article['categorySlug']}-{article['slug']}.json"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(article, f, indent=2, ensure_ascii=False)
+    
+    def close(self):
+        pass
+
+class JsonlShardSink:
+    """Appends articles to size-rotated JSONL shards under OUTPUT_DIR/shards.
+    
+    shards/manifest.json lists every shard with its article and byte counts.
+    It is rewritten atomically on rotation, on close and at most every
+    MANIFEST_INTERVAL seconds while articles are written, not per article.
+    `committedBytes` is the shard's size after its last complete record as
+    of that rewrite, so readers stop there and ignore anything a crash left
+    half written. Complete records a crash left past it are counted in the
+    next time the sink is opened. Compressed shards hold one gzip member
+    per record for the same reason. Each run starts a new shard.
+    """
+    
+    def __init__(self, directory=None, max_bytes=DEFAULT_SHARD_MB * 1024 * 1024, compress=False):
+        self.dir = Path(directory or OUTPUT_DIR / 'shards')
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.lock = threading.Lock()
+        self.manifest_path = self.dir / 'manifest.json'
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'totalArticles': 0, 'shards': []}
+        self.file = None
+        self.shard = None
+        self.manifest_written = time.monotonic()
+        if self._recover():
+            self._write_manifest()
+    
+    def _recover(self):
+        """Count complete records past each shard's committedBytes, returns how many were found"""
+        found = 0
+        for shard in self.manifest['shards']:
+            path = self.dir / shard['file']
+            committed = shard.get('committedBytes')
+            if committed is None or not path.exists() or path.stat().st_size <= committed:
+                continue
+            with open(path, 'rb') as f:
+                f.seek(committed)
+                data = f.read()
+            end = 0
+            while end < len(data):
+                if shard['file'].endswith('.gz'):
+                    member = zlib.decompressobj(wbits=31)
+                    try:
+                        line = member.decompress(data[end:])
+                    except zlib.error:
+                        break
+                    if not member.eof:
+                        break
+                    size = len(data) - end - len(member.unused_data)
+                else:
+                    newline = data.find(b'\n', end)
+                    if newline < 0:
+                        break
+                    line = data[end:newline + 1]
+                    size = len(line)
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                end += size
+                shard['articles'] += 1
+                shard['bytes'] += len(line)
+                self.manifest['totalArticles'] += 1
+                found += 1
+            shard['committedBytes'] = committed + end
+        if found:
+            print(f'  Recovered {found} articles written after the last shard manifest update')
+        return found
+    
+    def _rotate(self):
+        if self.file:
+            self.file.close()
+        number = len(self.manifest['shards']) + 1
+        name = f'articles-{number:05d}.jsonl' + ('.gz' if self.compress else '')
+        path = self.dir / name
+        self.file = open(path, 'ab')
+        self.shard = {'file': name, 'articles': 0, 'bytes': 0, 'committedBytes': self.file.tell()}
+        self.manifest['shards'].append(self.shard)
+        self._write_manifest()
+    
+    def _write_manifest(self):
+        self.manifest_written = time.monotonic()
+        self.manifest['updatedAt'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def write(self, article):
+        line = (json.dumps(article, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            if self.file is None or (self.shard['articles'] and self.shard['bytes'] + len(line) > self.max_bytes):
+                self._rotate()
+            self.file.write(gzip.compress(line) if self.compress else line)
+            self.file.flush()
+            self.shard['articles'] += 1
+            self.shard['bytes'] += len(line)
+            self.shard['committedBytes'] = self.file.tell()
+            self.manifest['totalArticles'] += 1
+            if time.monotonic() - self.manifest_written >= MANIFEST_INTERVAL:
+                self._write_manifest()
+    
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+                self._write_manifest()
+
+def iter_scraped_articles(scraped_dir=None):
+    """Yield every article dict in the output directory, from JSON files and JSONL shards"""
+    scraped_dir = Path(scraped_dir or OUTPUT_DIR)
+    for file in scraped_dir.glob('*.json'):
+        if file.name == 'summary.json':
+            continue
         try:
-            ext = os.path.splitext(urlparse(article['heroImage']).path)[1] or '.jpg'
-            filename = f'hero{ext}'
-            filepath = article_dir / filename
-            
-            if download_image(article['heroImage'], filepath):
-                new_path = f"/images/articles/{article['categorySlug']}/{article['slug']}/{filename}"
-                image_map[article['heroImage']] = new_path
-                article['heroImage'] = new_path
-                print(f'  ✓ Downloaded hero image')
-        except Exception as e:
-            print(f'  ✗ Failed to process hero image: {e}')
+            with open(file, 'r', encoding='utf-8') as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
     
-    # Process content images
-    for i, img_url in enumerate(article['images'], 1):
+    manifest_path = scraped_dir / 'shards' / 'manifest.json'
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            shards = json.load(f)['shards']
+    except (OSError, ValueError, KeyError):
+        return
+    for shard in shards:
+        path = manifest_path.parent / shard['file']
         try:
-            ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
-            filename = f'image-{i}{ext}'
-            filepath = article_dir / filename
-            
-            if download_image(img_url, filepath):
-                new_path = f"/images/articles/{article['categorySlug']}/{article['slug']}/{filename}"
-                image_map[img_url] = new_path
-                
-                # Update content HTML
-                article['content'] = article['content'].replace(img_url, new_path)
-                print(f'  ✓ Downloaded image {i}/{len(article["images"])}')
-                
-                time.sleep(0.5)  # Rate limiting
-        except Exception as e:
-            print(f'  ✗ Failed to process image {i}: {e}')
+            with open(path, 'rb') as f:
+                data = f.read(shard.get('committedBytes', -1))
+            if shard['file'].endswith('.gz'):
+                chunks = []
+                try:
+                    with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
+                        for line in gz:
+                            chunks.append(line)
+                except EOFError:
+                    # Shards from before committedBytes may end in a truncated member
+                    pass
+                data = b''.join(chunks)
+        except OSError as e:
+            print(f'  ✗ Could not read shard {shard["file"]}: {e}')
+            continue
+        for line in data.splitlines():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+class RunSummary:
+    """Streams summary entries to summary-<timestamp>.jsonl as articles are saved.
     
-    return image_map
+    finish() turns them into summary.json. If a run dies first, its entries
+    stay in its own summary-*.jsonl, and the next run that finishes folds
+    them into summary.json ahead of its own.
+    """
+    
+    def __init__(self, directory=None):
+        self.dir = Path(directory or OUTPUT_DIR)
+        self.leftovers = sorted(self.dir.glob('summary*.jsonl'))
+        if self.leftovers:
+            print(f'  Found {len(self.leftovers)} summaries from interrupted runs, adding them to summary.json')
+        self.stream_path = self.dir / f"summary-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+        self.file = open(self.stream_path, 'a', encoding='utf-8')
+        self.count = 0
+    
+    def add(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.count += 1
+    
+    @staticmethod
+    def _entries(path):
+        """Entries streamed to `path`, skipping a last line a crash cut short"""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    
+    def finish(self):
+        """Write summary.json from the streamed entries without holding them all in memory"""
+        self.file.close()
+        streams = self.leftovers + [self.stream_path]
+        total = self.count + sum(1 for path in self.leftovers for _ in self._entries(path))
+        summary_path = self.dir / 'summary.json'
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(f'{{\n  "totalArticles": {total},\n  "articles": [')
+            n = 0
+            for path in streams:
+                for entry in self._entries(path):
+                    entry = json.dumps(entry, indent=2, ensure_ascii=False)
+                    f.write((',' if n else '') + '\n    ' + entry.replace('\n', '\n    '))
+                    n += 1
+            f.write(f'\n  ],\n  "scrapedAt": "{time.strftime("%Y-%m-%dT%H:%M:%S")}"\n}}')
+        for path in streams:
+            path.unlink()
+        return summary_path
 
-def main():
-    print('Starting article scraping...\n')
+# Category resolution ported from import-scraped-articles.ts (mapCategorySlug,
+# inferCategoryFromTitle) so both paths file an article under the same category
+ARTICLE_CATEGORIES = {
+    'muscle-building': 'Muscle Building',
+    'fat-loss': 'Fat Loss',
+    'training': 'Training',
+    'nutrition': 'Nutrition',
+    'supplements': 'Supplements',
+    'for-women': 'For Women',
+    'motivation': 'Motivation',
+    'recovery': 'Recovery',
+    'sports-performance': 'Sports Performance',
+    'injury-prevention': 'Injury Prevention',
+    'fitness-lifestyle': 'Fitness Lifestyle',
+    'athlete-profiles-interviews': 'Athlete Profiles & Interviews',
+}
+IMPORT_CATEGORY_MAPPING = {
+    'muscle-building': 'muscle-building',
+    'fat-loss': 'fat-loss',
+    'training': 'training',
+    'nutrition': 'nutrition',
+    'supplements': 'supplements',
+    'women': 'for-women',
+    'for-women': 'for-women',
+    'motivation': 'motivation',
+    'recovery': 'recovery',
+    'sports-performance': 'sports-performance',
+    'injury-prevention': 'injury-prevention',
+    'fitness-lifestyle': 'fitness-lifestyle',
+    'athlete-profiles': 'athlete-profiles-interviews',
+    'athlete-profiles-interviews': 'athlete-profiles-interviews',
+    'protein.html': 'nutrition',
+    'protein': 'nutrition',
+    'general': 'training',
+    'articles': 'training',
+    'workouts': 'training',
+}
+TITLE_CATEGORY_RULES = [
+    ('muscle-building', lambda t: 'muscle building' in t or 'muscle-building' in t),
+    ('fat-loss', lambda t: 'fat loss' in t or 'fat-loss' in t),
+    ('for-women', lambda t: "women's" in t or 'for women' in t or 'women fitness' in t),
+    ('nutrition', lambda t: 'nutrition' in t and 'supplement' not in t),
+    ('supplements', lambda t: 'supplement' in t),
+    ('motivation', lambda t: 'motivation' in t),
+    ('recovery', lambda t: 'recovery' in t),
+    ('sports-performance', lambda t: 'sports performance' in t or 'sport performance' in t),
+    ('injury-prevention', lambda t: 'injury prevention' in t or 'injury-prevention' in t),
+    ('fitness-lifestyle', lambda t: 'fitness lifestyle' in t or 'fitness-lifestyle' in t),
+    ('athlete-profiles-interviews',
+     lambda t: 'athlete profile' in t or 'interview' in t or 'transformation story' in t),
+    ('nutrition', lambda t: any(k in t for k in ('diet plan', 'meal plan', 'eating', 'ketogenic', 'iifym',
+                                                  'carb cycling', 'intermittent fasting'))),
+    ('training', lambda t: 'training' in t and 'article' not in t),
+]
+TITLE_CATEGORY_KEYWORDS = {
+    'muscle-building': ['muscle', 'build', 'hypertrophy', 'gains', 'mass', 'size', 'grow', 'bulk'],
+    'fat-loss': ['lose weight', 'losing weight', 'weight loss', 'burn fat', 'cut', 'cutting', 'shed'],
+    'nutrition': ['diet', 'meal', 'food', 'protein', 'carb', 'calorie', 'eating', 'macros'],
+    'supplements': ['protein powder', 'creatine', 'pre workout', 'bcaa', 'vitamin', 'multivitamin'],
+    'for-women': ['women', 'woman', 'female', 'ladies', 'mom', 'pregnancy', 'postpartum'],
+    'training': ['workout', 'exercise', 'program', 'routine', 'plan', 'schedule'],
+    'motivation': ['motivate', 'inspire', 'mindset', 'mental', 'success story'],
+    'recovery': ['rest', 'sleep', 'rehab', 'soreness', 'doms', 'rest day'],
+    'sports-performance': ['sport', 'athletic', 'performance', 'endurance', 'sprint', 'marathon', 'competition'],
+    'injury-prevention': ['injury', 'prevent', 'pain', 'hurt', 'physical therapy', 'physio'],
+    'fitness-lifestyle': ['lifestyle', 'life', 'balance', 'wellness', 'healthy living', 'habits'],
+    'athlete-profiles-interviews': ['profile', 'interview', 'athlete', 'story', 'feature', 'spotlight'],
+}
+
+def infer_category_from_title(title):
+    """Category slug for an article title, 'training' if nothing matches"""
+    lower_title = title.lower()
+    for slug, matches in TITLE_CATEGORY_RULES:
+        if matches(lower_title):
+            return slug
     
-    article_urls = get_article_links()
-    scraped_articles = []
+    best, best_score = 'training', 0
+    for slug, keywords in TITLE_CATEGORY_KEYWORDS.items():
+        score = sum(keyword in lower_title for keyword in keywords)
+        if score > best_score:
+            best, best_score = slug, score
+    return best
+
+def map_category_slug(old_slug, title=None):
+    """Site category slug for a scraped article, as the TS importer picks it"""
+    if title:
+        inferred = infer_category_from_title(title)
+        if inferred != 'training' or not old_slug:
+            return inferred
+    if not old_slug:
+        return infer_category_from_title(title or '')
     
-    for i, url in enumerate(article_urls, 1):
-        print(f'\n[{i}/{len(article_urls)}] Processing article...')
+    normalized = re.sub(r'\.html$', '', old_slug.lower()).strip()
+    if normalized in ('training', 'general', 'articles', 'workouts') and title:
+        inferred = infer_category_from_title(title)
+        if inferred != 'training':
+            return inferred
+    
+    if normalized in IMPORT_CATEGORY_MAPPING:
+        return IMPORT_CATEGORY_MAPPING[normalized]
+    for old_key, new_key in IMPORT_CATEGORY_MAPPING.items():
+        if old_key in normalized or normalized in old_key:
+            return new_key
+    for slug in ARTICLE_CATEGORIES:
+        if slug in normalized or normalized in slug:
+            return slug
+    return 'training'
+
+class MongoSink:
+    """Upserts articles straight into the `articles` collection in batches.
+    
+    write() only queues the article; a background thread sends the queue as
+    one unordered bulk_write once `batch_size` articles are waiting or
+    `flush_interval` seconds have passed, so the crawl never waits on the
+    database. Articles match on sourceUrl, or on slug for documents created
+    by import-scraped-articles.ts, which never set sourceUrl (the upsert
+    backfills it). Categories are resolved with map_category_slug() and
+    created if missing, like the importer does. `on_error(url, message)` is
+    called for every article whose upsert failed.
+    """
+    
+    AUTHOR_EMAIL = 'muscleandstrength@example.com'
+    
+    def __init__(self, db, batch_size=DEFAULT_MONGO_SINK_BATCH, flush_interval=DEFAULT_MONGO_SINK_INTERVAL,
+                 on_error=None):
+        self.db = db
+        self.articles = db.get_collection('articles')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.lock = threading.Lock()
+        self.pending = []
+        self.category_ids = {}
+        self.author_id = self._author_id()
+        self.written = 0
+        self.failed = 0
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self.flusher.start()
+    
+    def _author_id(self):
+        authors = self.db.get_collection('authors')
+        author = authors.find_one({'email': self.AUTHOR_EMAIL}, {'_id': 1})
+        if author:
+            return author['_id']
+        return authors.insert_one({
+            'name': 'Muscle & Strength',
+            'email': self.AUTHOR_EMAIL,
+            'avatar': 'https://api.dicebear.com/7.x/avataaars/svg?seed=MuscleStrength',
+            'bio': 'Fitness and strength training content from Muscle & Strength',
+        }).inserted_id
+    
+    def _category_id(self, slug):
+        if slug not in self.category_ids:
+            name = ARTICLE_CATEGORIES[slug]
+            category = self.db.get_collection('categories').find_one_and_update(
+                {'slug': slug},
+                {'$set': {'name': name, 'slug': slug,
+                          'description': f'Articles about {name.lower()}'}},
+                projection={'_id': 1}, upsert=True, return_document=True)
+            self.category_ids[slug] = category['_id']
+        return self.category_ids[slug]
+    
+    def _operation(self, article, known_urls):
+        from pymongo import UpdateOne
         
-        article = scrape_article(url)
-        if not article:
-            continue
+        now = datetime.now(timezone.utc)
+        slug = article['slug'].replace('.html', '')
+        fields = {
+            'title': article['title'],
+            'slug': slug,
+            'excerpt': article['excerpt'] or article['title'][:200],
+            'content': article['content'],
+            'heroImage': article['heroImage'] or None,
+            'sourceUrl': article['url'],
+            'authorId': self.author_id,
+            'categoryId': self._category_id(map_category_slug(article['categorySlug'], article['title'])),
+            'updatedAt': now,
+        }
+        match = {'sourceUrl': article['url']} if article['url'] in known_urls else {'slug': slug}
+        return UpdateOne(
+            match,
+            {
+                '$set': fields,
+                '$setOnInsert': {
+                    'publishedAt': datetime.strptime(article['scrapedAt'], '%Y-%m-%dT%H:%M:%S'),
+                    'views': 0,
+                    'tagIds': [],
+                    'proofread': False,
+                    'createdAt': now,
+                },
+            },
+            upsert=True,
+        )
+    
+    def write(self, article):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self.lock:
+            self.pending.append((article, loop))
+            if len(self.pending) >= self.batch_size:
+                self.wake.set()
+    
+    def _report(self, batch, failures):
+        """Hand failed upserts to on_error on the thread that wrote them.
         
-        # Download images
-        print('  Downloading images...')
-        process_images(article)
+        Going through the event loop means a failure is only recorded after
+        the crawl has finished marking that article as saved.
+        """
+        for index, message in failures:
+            self.failed += 1
+            article, loop = batch[index]
+            if self.on_error is None:
+                continue
+            try:
+                if loop is None or loop.is_closed():
+                    raise RuntimeError
+                loop.call_soon_threadsafe(self.on_error, article['url'], message)
+            except RuntimeError:
+                self.on_error(article['url'], message)
+    
+    def _flush(self):
+        """Send the queued upserts. Only the flusher thread and close() call this."""
+        with self.lock:
+            batch, self.pending = self.pending, []
+            self.wake.clear()
+        if not batch:
+            return
+        from pymongo.errors import BulkWriteError
         
-        # Save article JSON
-        article['scrapedAt'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        failures = []
+        try:
+            urls = [article['url'] for article, _ in batch]
+            known_urls = {doc['sourceUrl'] for doc in self.articles.find(
+                {'sourceUrl': {'$in': urls}}, {'sourceUrl': 1, '_id': 0})}
+            operations = [self._operation(article, known_urls) for article, _ in batch]
+            result = self.articles.bulk_write(operations, ordered=False)
+            self.written += result.upserted_count + result.matched_count
+        except BulkWriteError as e:
+            details = e.details or {}
+            self.written += details.get('nUpserted', 0) + details.get('nMatched', 0)
+            failures = [(error['index'], error.get('errmsg', 'upsert failed'))
+                        for error in details.get('writeErrors', [])]
+        except Exception as e:
+            failures = [(index, str(e)) for index in range(len(batch))]
+        if failures:
+            print(f'  ✗ {len(failures)} of {len(batch)} database upserts failed: {failures[0][1]}')
+            self._report(batch, failures)
+    
+    def _flush_periodically(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.flush_interval)
+            self._flush()
+    
+    def close(self):
+        self.stopped.set()
+        self.wake.set()
+        self.flusher.join()
+        self._flush()
+        print(f'  Upserted {self.written} articles into the database'
+              + (f', {self.failed} failed' if self.failed else ''))
+
+class MultiSink:
+    """Writes each article to several sinks"""
+    
+    def __init__(self, sinks):
+        self.sinks = sinks
+    
+    def write(self, article):
+        for sink in self.sinks:
+            sink.write(article)
+    
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+# Set by main()
+article_sink = None
+run_summary = None
+
+def save_article(article):
+    """Write an article to the output sink, record it in the crawl index and the run summary"""
+    article['scrapedAt'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    
+    with metrics.timer('save'):
+        (article_sink or JsonFileSink()).write(article)
+        get_crawl_index().record_article(article)
+    metrics.inc('articles_saved')
+    
+    print(f'  ✓ Article saved: {article["title"]}')
+    entry = {
+        'title': article['title'],
+        'slug': article['slug'],
+        'category': article['categoryName'],
+        'categorySlug': article['categorySlug'],
+    }
+    if run_summary:
+        run_summary.add(entry)
+    return entry
+
+class CrawlJournal:
+    """Durable per-URL crawl state in the `frontier` table of the crawl index file.
+    
+    States are pending -> fetched -> images-done -> saved, duplicate for
+    skipped near-duplicates, or failed with an attempt count and the
+    earliest time to try again. Fetched page bodies
+    are kept until the article is saved, so a resumed run picks up each URL
+    where it stopped without fetching the page again.
+    """
+    
+    def __init__(self, path=None, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff=DEFAULT_RETRY_BACKOFF):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path or INDEX_PATH), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                body BLOB,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+    
+    def _execute(self, sql, params=()):
+        with self.lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+    
+    def enqueue(self, urls):
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, state, updated_at) VALUES (?, 'pending', ?)",
+                [(url, time.time()) for url in urls])
+            self.conn.commit()
+    
+    def resumable(self):
+        """URLs a previous run left unfinished, plus failures that are due for another attempt"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                '''SELECT url FROM frontier
+                   WHERE state IN ('pending', 'fetched', 'images-done')
+                      OR (state = 'failed' AND attempts < ? AND next_attempt_at <= ?)
+                   ORDER BY updated_at''', (self.max_attempts, time.time()))]
+    
+    def page_body(self, url):
+        """The stored page body if the URL was fetched but not saved yet"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body FROM frontier WHERE url = ? AND state IN ('fetched', 'images-done')", (url,)).fetchone()
+        return row[0] if row else None
+    
+    def mark(self, url, state, body=None):
+        self._execute(
+            '''INSERT INTO frontier (url, state, body, updated_at) VALUES (?, ?, ?, ?)
+               ON CONFLICT (url) DO UPDATE SET
+                   state = excluded.state,
+                   body = COALESCE(excluded.body, CASE WHEN excluded.state IN ('saved', 'duplicate') THEN NULL ELSE frontier.body END),
+                   updated_at = excluded.updated_at''', (url, state, body, time.time()))
+    
+    def mark_failed(self, url, error, transient=False, retry_after=None):
+        """Record a failure and return the delay before the next attempt, or None to give up"""
+        with self.lock:
+            row = self.conn.execute('SELECT attempts FROM frontier WHERE url = ?', (url,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            delay = None
+            next_attempt_at = time.time()
+            if not transient:
+                # Permanent errors (404, extraction failures) are not retried by later runs either
+                attempts = max(attempts, self.max_attempts)
+            elif retry_after and retry_after > MAX_RETRY_DELAY:
+                # Too long to wait in this run, resumable() picks it up once the time has passed
+                next_attempt_at += retry_after
+            elif attempts < self.max_attempts:
+                # Exponential backoff with jitter, never sooner than the server asked for
+                delay = min(self.backoff * 2 ** (attempts - 1), MAX_RETRY_DELAY) * random.uniform(0.8, 1.2)
+                delay = max(delay, retry_after or 0)
+                next_attempt_at += delay
+            self.conn.execute(
+                '''INSERT INTO frontier (url, state, attempts, next_attempt_at, last_error, updated_at)
+                   VALUES (?, 'failed', ?, ?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET
+                       state = 'failed',
+                       attempts = excluded.attempts,
+                       next_attempt_at = excluded.next_attempt_at,
+                       last_error = excluded.last_error,
+                       updated_at = excluded.updated_at''',
+                (url, attempts, next_attempt_at, error, time.time()))
+            self.conn.commit()
+        return delay
+    
+    def reset(self):
+        self._execute('DELETE FROM frontier')
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# Set by main(), None in replay mode
+crawl_journal = None
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+NEAR_DUP_MIN_WORDS = 50  # shorter pages share too much boilerplate to compare
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+')
+# Bit i of a shingle hash becomes lane i of a big integer, so per-bit weights
+# are summed with one multiply-add per shingle instead of a 64-step loop
+SIMHASH_LANE_BITS = 32
+SIMHASH_SPREAD = [
+    [sum((byte >> k & 1) << ((8 * j + k) * SIMHASH_LANE_BITS) for k in range(8)) for byte in range(256)]
+    for j in range(SIMHASH_BITS // 8)
+]
+
+def simhash(content):
+    """64-bit SimHash of the text in an article's content HTML over 3-word shingles,
+    or None if there is too little text to fingerprint"""
+    words = WORD_RE.findall(unescape(TAG_RE.sub(' ', content or '')).lower())
+    if len(words) < NEAR_DUP_MIN_WORDS:
+        return None
+    shingles = Counter(' '.join(words[i:i + 3]) for i in range(len(words) - 2))
+    
+    lanes = 0
+    for shingle, weight in shingles.items():
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=SIMHASH_BITS // 8).digest()
+        lanes += weight * sum(table[byte] for table, byte in zip(SIMHASH_SPREAD, digest))
+    half = sum(shingles.values()) / 2
+    mask = (1 << SIMHASH_LANE_BITS) - 1
+    return sum(1 << bit for bit in range(SIMHASH_BITS)
+               if (lanes >> (bit * SIMHASH_LANE_BITS) & mask) > half)
+
+def article_fingerprint(article):
+    return simhash(article.get('content'))
+
+class NearDuplicateIndex:
+    """LSH index of article SimHashes in the crawl index file.
+    
+    Each fingerprint is split into SIMHASH_BANDS bands stored in an indexed
+    table. Two fingerprints within SIMHASH_BANDS - 1 bits of each other share
+    at least one band exactly, so a lookup only compares the few articles
+    that collide on a band instead of the whole corpus.
+    """
+    
+    BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+    
+    def __init__(self, path=None, distance=DEFAULT_NEAR_DUP_DISTANCE):
+        self.distance = distance
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path or INDEX_PATH), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                url TEXT PRIMARY KEY,
+                simhash INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fingerprint_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (band, value, url)
+            ) WITHOUT ROWID;
+        ''')
+        self.conn.commit()
+    
+    @classmethod
+    def bands(cls, fingerprint):
+        mask = (1 << cls.BAND_BITS) - 1
+        return [(band, fingerprint >> (band * cls.BAND_BITS) & mask) for band in range(SIMHASH_BANDS)]
+    
+    @staticmethod
+    def _signed(fingerprint):
+        # SQLite integers are signed 64-bit
+        return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+    
+    def _nearest(self, url, fingerprint):
+        where = ' OR '.join(['(b.band = ? AND b.value = ?)'] * SIMHASH_BANDS)
+        params = [value for band in self.bands(fingerprint) for value in band]
+        rows = self.conn.execute(
+            f'''SELECT DISTINCT f.url, f.simhash FROM fingerprint_bands b
+                JOIN fingerprints f ON f.url = b.url WHERE {where}''', params).fetchall()
+        best = None
+        for other_url, other in rows:
+            if other_url == url:
+                continue
+            distance = bin((other & ((1 << 64) - 1)) ^ fingerprint).count('1')
+            if distance <= self.distance and (best is None or distance < best[1]):
+                best = (other_url, distance)
+        return best
+    
+    def _add(self, url, fingerprint):
+        self.conn.execute('DELETE FROM fingerprint_bands WHERE url = ?', (url,))
+        self.conn.execute('INSERT OR REPLACE INTO fingerprints (url, simhash) VALUES (?, ?)',
+                          (url, self._signed(fingerprint)))
+        self.conn.executemany('INSERT INTO fingerprint_bands (band, value, url) VALUES (?, ?, ?)',
+                              [(band, value, url) for band, value in self.bands(fingerprint)])
+    
+    def claim(self, url, fingerprint):
+        """Return (url, distance) of the closest indexed near-duplicate of `url`, or add
+        `url` to the index and return None. Checking and adding under one lock means
+        only the first of two copies crawled at the same time gets through."""
+        with self.lock:
+            match = self._nearest(url, fingerprint)
+            if match is None:
+                self._add(url, fingerprint)
+                self.conn.commit()
+            return match
+    
+    def is_empty(self):
+        with self.lock:
+            return self.conn.execute('SELECT 1 FROM fingerprints LIMIT 1').fetchone() is None
+    
+    def rebuild_from_files(self, scraped_dir=None):
+        """Fingerprint the existing JSON files and JSONL shards, used when the index is new"""
+        added = 0
+        for data in iter_scraped_articles(scraped_dir):
+            fingerprint = article_fingerprint(data)
+            if data.get('url') and fingerprint is not None:
+                with self.lock:
+                    self._add(data['url'], fingerprint)
+                added += 1
+        with self.lock:
+            self.conn.commit()
+        return added
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# Set by main(): 'skip' or 'flag' near-duplicate articles, None to keep them all
+near_duplicates = None
+near_duplicate_mode = None
+
+async def crawl(article_urls, concurrency=DEFAULT_CONCURRENCY, image_workers=DEFAULT_IMAGE_WORKERS,
+                parse_workers=0, progress_interval=DEFAULT_PROGRESS_INTERVAL):
+    """Scrape articles with up to `concurrency` page requests in flight.
+    
+    Blocking requests calls run on a thread pool sharing the pooled session;
+    pacing comes from the per-host rate limiters inside fetch(). With
+    `parse_workers` set, raw pages are handed to a process pool for
+    extraction so parsing scales with cores. Images go through a separate
+    ImagePipeline so the next page can be fetched while the previous
+    article's images download.
+    """
+    loop = asyncio.get_running_loop()
+    parse_pool = make_parse_pool(parse_workers)
+    executor = ThreadPoolExecutor(max_workers=concurrency + image_workers)
+    queue = asyncio.Queue()
+    for item in enumerate(article_urls, 1):
+        queue.put_nowait(item)
+    metrics.gauge('articles', queue.qsize())
+    
+    saved = 0
+    
+    def on_done(article):
+        nonlocal saved
+        if crawl_journal:
+            crawl_journal.mark(article['url'], 'images-done')
+        save_article(article)
+        if crawl_journal:
+            crawl_journal.mark(article['url'], 'saved')
+        saved += 1
+    
+    pipeline = ImagePipeline(executor, on_done, workers=image_workers)
+    pipeline.start()
+    
+    def failed(url, error, transient=False, retry_after=None):
+        """Record a failed URL, returns the retry delay or None"""
+        metrics.inc('articles_failed')
+        get_crawl_index().record(url, url.rstrip('/').split('/')[-1], 'failed')
+        if crawl_journal is None:
+            return None
+        delay = crawl_journal.mark_failed(url, str(error), transient, retry_after)
+        if delay is not None:
+            print(f'  Retrying in {delay:.0f}s')
+        elif transient and retry_after and retry_after > MAX_RETRY_DELAY:
+            print(f'  Server asked to wait {retry_after:.0f}s, leaving it for the next run')
+        return delay
+    
+    async def process(i, url):
+        """Fetch and parse one article, returns a retry delay if it should be tried again"""
+        print(f'\n[{i}/{len(article_urls)}] Processing article...')
         
-        json_path = OUTPUT_DIR / f"{article['categorySlug']}-{article['slug']}.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(article, f, indent=2, ensure_ascii=False)
+        html = crawl_journal.page_body(url) if crawl_journal else None
+        if html is None:
+            try:
+                html = await loop.run_in_executor(executor, fetch_page, url)
+            except FetchError as e:
+                print(f'  ✗ Error scraping article: {e}')
+                return failed(url, e, e.transient, e.retry_after)
+            if crawl_journal:
+                crawl_journal.mark(url, 'fetched', html)
         
-        scraped_articles.append({
-            'title': article['title'],
-            'slug': article['slug'],
-            'category': article['categoryName'],
-            'categorySlug': article['categorySlug'],
-        })
+        try:
+            with metrics.timer('extract'):
+                article = await loop.run_in_executor(
+                    parse_pool or executor, extract_with, extractor_name, html, url)
+        except Exception as e:
+            print(f'  ✗ Error scraping article: {e}')
+            return failed(url, e)
         
-        print(f'  ✓ Article saved: {article["title"]}')
+        if near_duplicates is not None:
+            # Fingerprint before any image is queued, copies should cost one page fetch at most
+            with metrics.timer('fingerprint'):
+                fingerprint = await loop.run_in_executor(parse_pool or executor, simhash, article['content'])
+            match = near_duplicates.claim(url, fingerprint) if fingerprint is not None else None
+            if match:
+                original, distance = match
+                metrics.inc('articles_near_duplicate')
+                if near_duplicate_mode == 'skip':
+                    print(f'  ✗ Near-duplicate of {original} (SimHash distance {distance}), skipping')
+                    get_crawl_index().record(url, article['slug'], 'duplicate', article['content'])
+                    if crawl_journal:
+                        crawl_journal.mark(url, 'duplicate')
+                    return None
+                print(f'  ✗ Near-duplicate of {original} (SimHash distance {distance}), saving without images')
+                article['nearDuplicateOf'] = original
+                on_done(article)
+                return None
         
-        # Rate limiting between articles
-        if i < len(article_urls):
-            time.sleep(2)
+        await pipeline.submit(article)
+        return None
     
-    # Save summary
-    summary = {
-        'totalArticles': len(scraped_articles),
-        'articles': scraped_articles,
-        'scrapedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
-    }
+    def requeue(item):
+        queue.put_nowait(item)
+        metrics.gauge('articles', queue.qsize())
+        queue.task_done()
+    
+    async def worker():
+        while True:
+            item = await queue.get()
+            metrics.gauge('articles', queue.qsize())
+            retry_in = None
+            try:
+                retry_in = await process(*item)
+            except Exception as e:
+                print(f'  ✗ Error scraping article: {e}')
+            finally:
+                if retry_in is None:
+                    queue.task_done()
+                else:
+                    # The item stays unfinished until it is back in the queue
+                    loop.call_later(retry_in, requeue, item)
+    
+    async def report_progress():
+        while True:
+            await asyncio.sleep(progress_interval)
+            print(metrics.progress_line(saved, len(article_urls)), flush=True)
+    
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    if progress_interval > 0:
+        workers.append(asyncio.create_task(report_progress()))
+    try:
+        await queue.join()
+        await pipeline.close()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        executor.shutdown(wait=True)
+        if parse_pool:
+            parse_pool.shutdown(wait=True)
+    
+    return saved
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape articles from muscleandstrength.com')
+    parser.add_argument('--base-url', default=None,
+                        help=f'site to scrape (default: SCRAPER_BASE_URL or {BASE_URL})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='maximum number of requests in flight (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help='requests per second per host, 0 disables limiting (default: %(default)s)')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST,
+                        help='token bucket size per host (default: %(default)s)')
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help='re-import scraped JSON files into the crawl index before starting')
+    parser.add_argument('--discovery', choices=['listing', 'sitemap'], default='listing',
+                        help='find articles by crawling listing pages or by reading the sitemap (default: %(default)s)')
+    parser.add_argument('--sitemap-url', default=None,
+                        help='sitemap or sitemap index to read in sitemap mode (default: BASE_URL/sitemap.xml)')
+    parser.add_argument('--http-cache-mb', type=float, default=DEFAULT_HTTP_CACHE_MB,
+                        help='size of the listing page cache in MB, 0 disables it (default: %(default)s)')
+    parser.add_argument('--http-cache-ttl', type=float, default=None,
+                        help='seconds a cached listing page is reused without a request when the server '
+                             'sends no Cache-Control max-age or Expires (default: 10%% of its age since '
+                             'Last-Modified, at most a day)')
+    parser.add_argument('--mongo-dedupe', choices=['snapshot', 'resync', 'candidates', 'off'], default='snapshot',
+                        help='how to skip articles already in MongoDB: incremental local snapshot, '
+                             'full snapshot refresh, batched lookups of discovered URLs, or no check '
+                             '(default: %(default)s)')
+    parser.add_argument('--extractor', choices=sorted(EXTRACTORS), default='legacy',
+                        help=f'HTML extraction backend, "fast" parses with {FAST_PARSER}, which can repair '
+                             f'malformed markup differently and change content and excerpt on such pages '
+                             f'(default: %(default)s)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='extract pages in this many worker processes, 0 parses on the fetch threads '
+                             '(default: %(default)s)')
+    parser.add_argument('--check-extractors', action='store_true',
+                        help='compare both extractors on the discovered articles without saving anything, '
+                             'combine with --replay to check archived pages offline')
+    parser.add_argument('--archive', action='store_true',
+                        help='keep raw page and image responses in a WARC archive for later replay')
+    parser.add_argument('--replay', action='store_true',
+                        help='re-extract every archived page and its images from the archive, without network access')
+    parser.add_argument('--archive-dir', type=Path, default=None,
+                        help=f'archive location (default: {ARCHIVE_DIR})')
+    parser.add_argument('--no-image-store', action='store_true',
+                        help='save a separate copy of every image per article instead of linking from '
+                             'the shared content-addressed store')
+    parser.add_argument('--output', choices=['json', 'jsonl'], default='json',
+                        help='one JSON file per article, or appended JSONL shards with a manifest (default: %(default)s)')
+    parser.add_argument('--shard-mb', type=float, default=DEFAULT_SHARD_MB,
+                        help='rotate JSONL shards at this size (default: %(default)s)')
+    parser.add_argument('--compress', action='store_true',
+                        help='gzip JSONL shards')
+    parser.add_argument('--mongo-sink', action='store_true',
+                        help='also upsert articles into the MONGODB_URI articles collection as they are saved')
+    parser.add_argument('--mongo-batch-size', type=int, default=DEFAULT_MONGO_SINK_BATCH,
+                        help='articles per database bulk write (default: %(default)s)')
+    parser.add_argument('--mongo-flush-interval', type=float, default=DEFAULT_MONGO_SINK_INTERVAL,
+                        help='seconds before a partial batch is written (default: %(default)s)')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help='tries per article before it is given up on (default: %(default)s)')
+    parser.add_argument('--retry-backoff', type=float, default=DEFAULT_RETRY_BACKOFF,
+                        help='seconds before the first retry, doubled on each attempt (default: %(default)s)')
+    parser.add_argument('--reset-journal', action='store_true',
+                        help='forget unfinished and failed articles from earlier runs')
+    parser.add_argument('--near-duplicates', choices=['skip', 'flag', 'off'], default='off',
+                        help='near-duplicate articles: skip them, save them with nearDuplicateOf '
+                             'and without downloading their images, or do not check; the first run '
+                             'with a check fingerprints every article already saved (default: off)')
+    parser.add_argument('--near-dup-distance', type=int, default=DEFAULT_NEAR_DUP_DISTANCE,
+                        choices=range(SIMHASH_BANDS),
+                        help='SimHash bits two articles may differ by and still be near-duplicates '
+                             '(default: %(default)s)')
+    parser.add_argument('--report', type=Path, default=None,
+                        help=f'where to write the JSON run report (default: {REPORT_PATH})')
+    parser.add_argument('--prometheus-textfile', type=Path, default=None,
+                        help='also write run metrics in Prometheus textfile format to this path')
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_PROGRESS_INTERVAL,
+                        help='seconds between progress lines, 0 disables them (default: %(default)s)')
+    parser.add_argument('--image-workers', type=int, default=DEFAULT_IMAGE_WORKERS,
+                        help='number of parallel image downloads (default: %(default)s)')
+    parser.add_argument('--image-rate', type=float, default=DEFAULT_IMAGE_RATE,
+                        help='image requests per second per host, 0 disables limiting (default: %(default)s)')
+    parser.add_argument('--optimize-images', action='store_true',
+                        help='write resized copies, responsive widths and a thumbnail of every image '
+                             '(needs Pillow)')
+    parser.add_argument('--optimize-workers', type=int, default=None,
+                        help='processes encoding optimized images (default: CPU count)')
+    parser.add_argument('--image-format', choices=['webp', 'avif'], default='webp',
+                        help='format of the optimized copies (default: %(default)s)')
+    parser.add_argument('--image-max-width', type=int, default=DEFAULT_IMAGE_MAX_WIDTH,
+                        help='maximum width of the optimized copies in pixels (default: %(default)s)')
+    parser.add_argument('--image-quality', type=int, default=DEFAULT_IMAGE_QUALITY,
+                        help='encoder quality of the optimized copies, 1-100 (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.image_workers < 1:
+        parser.error('--image-workers must be at least 1')
+    if args.archive and args.replay:
+        parser.error('--archive and --replay cannot be combined')
+    if not 1 <= args.image_quality <= 100:
+        parser.error('--image-quality must be between 1 and 100')
+    return args
+
+def main(argv=None):
+    global BASE_URL, extractor_name, response_archive, replay_archive, image_store, article_sink, run_summary, crawl_journal
+    global near_duplicates, near_duplicate_mode, image_optimizer
+    args = parse_args(argv)
+    if args.base_url:
+        BASE_URL = args.base_url.rstrip('/')
+    extractor_name = args.extractor
+    if not args.no_image_store:
+        image_store = ImageStore()
+    configure_http(args.concurrency + args.image_workers, args.rate, args.burst, args.image_rate)
+    
+    print('Starting article scraping...\n')
+    
+    get_crawl_index(rebuild=args.rebuild_index)
+    configure_http_cache(args.http_cache_mb, args.http_cache_ttl)
     
-    summary_path = OUTPUT_DIR / 'summary.json'
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    if args.replay:
+        replay_archive = ResponseArchive(args.archive_dir, readonly=True)
+        article_urls = replay_archive.urls('page')
+        print(f'Replaying {len(article_urls)} archived articles from {replay_archive.dir}\n')
+    elif args.discovery == 'sitemap':
+        article_urls = get_sitemap_links(args.sitemap_url, args.mongo_dedupe)
+    else:
+        article_urls = get_article_links(args.mongo_dedupe)
+    if args.archive:
+        response_archive = ResponseArchive(args.archive_dir)
+    if args.check_extractors:
+        check_extractor_parity(article_urls)
+        return
+    
+    if not args.replay:
+        crawl_journal = CrawlJournal(max_attempts=args.max_attempts, backoff=args.retry_backoff)
+        if args.reset_journal:
+            crawl_journal.reset()
+        resumed = crawl_journal.resumable()
+        if resumed:
+            print(f'Resuming {len(resumed)} unfinished articles from earlier runs\n')
+            article_urls = list(dict.fromkeys(resumed + article_urls))
+        crawl_journal.enqueue(article_urls)
+    
+    if args.near_duplicates != 'off':
+        near_duplicates = NearDuplicateIndex(distance=args.near_dup_distance)
+        near_duplicate_mode = args.near_duplicates
+        if args.rebuild_index or near_duplicates.is_empty():
+            print(f'Fingerprinted {near_duplicates.rebuild_from_files()} existing articles for near-duplicate checks\n')
+    
+    if args.output == 'jsonl':
+        article_sink = JsonlShardSink(max_bytes=int(args.shard_mb * 1024 * 1024), compress=args.compress)
+    else:
+        article_sink = JsonFileSink()
+    mongo = connect_mongo() if args.mongo_sink else None
+    if args.mongo_sink and mongo is None:
+        print('  MONGODB_URI not set, not writing to the database')
+    if mongo:
+        def database_failed(url, message):
+            # Leave the article for the next run to retry
+            if crawl_journal:
+                crawl_journal.mark_failed(url, f'database upsert failed: {message}', transient=True)
+        
+        article_sink = MultiSink([article_sink, MongoSink(mongo[1], args.mongo_batch_size, args.mongo_flush_interval,
+                                                          on_error=database_failed)])
+    if args.optimize_images:
+        image_optimizer = make_image_optimizer(args.optimize_workers, args.image_format,
+                                               args.image_max_width, args.image_quality)
+    run_summary = RunSummary()
+    try:
+        saved = asyncio.run(crawl(article_urls, args.concurrency, args.image_workers, args.parse_workers,
+                                  args.progress_interval))
+    finally:
+        article_sink.close()
+        if image_optimizer:
+            image_optimizer.close()
+        if mongo:
+            mongo[0].close()
+        metrics.write_json(args.report or REPORT_PATH)
+        if args.prometheus_textfile:
+            metrics.write_prometheus(args.prometheus_textfile)
+    
+    # Save summary
+    run_summary.finish()
     
     print(f'\n\n✓ Scraping complete!')
-    print(f'  Articles scraped: {len(scraped_articles)}')
+    print(f'  Articles scraped: {saved}')
     print(f'  Output directory: {OUTPUT_DIR}')
     print(f'  Images directory: {IMAGES_DIR}')
+    print(f'  Run report: {args.report or REPORT_PATH}')
 
 if __name__ == '__main__':
     main()
@@ -165,18 +165,27 @@ async function uploadImagesToCloudinary() {
           continue
         }
         
+        // Size-capped copies written by scrape_articles.py --optimize-images. The responsive
+        // widths and thumbnails next to them are only for local serving and are not uploaded.
+        const variantsPath = join(articlePath, 'variants')
+        const variantFiles = existsSync(variantsPath) ? await readdir(variantsPath) : []
+        
         console.log(`  📄 ${articleTitle.substring(0, 50)}... (${imageFiles.length} images)`)
         
         // Process each image
         for (let i = 0; i < imageFiles.length; i++) {
           const imageFile = imageFiles[i]
-          const imagePath = join(articlePath, imageFile)
-          const ext = extname(imageFile).replace('.', '')
+          const optimizedFile = variantFiles.find(f =>
+            f.startsWith(`${basename(imageFile, extname(imageFile))}.opt.`)
+          )
+          // Upload the optimized copy in place of the original when there is one
+          const imagePath = optimizedFile ? join(variantsPath, optimizedFile) : join(articlePath, imageFile)
+          const ext = extname(imagePath).replace('.', '')
           
           try {
             // Determine if it's a hero image or content image
             const isHero = imageFile.toLowerCase().includes('hero') || 
-                          imageFile.toLowerCase() === articleSlug + '.' + ext ||
+                          imageFile.toLowerCase() === articleSlug + extname(imageFile).toLowerCase() ||
                           (i === 0 && imageFiles.length === 1)
             
             // Generate public_id based on article title